@@ -1,15 +1,39 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Optional, List, Any, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import functools
+import math
 import uvicorn
 import os
 import json
 import tempfile
+from datetime import date
 from management_tracker import PropertyManagementTracker
+from task_storage import GoogleSheetsStorage, SQLiteStorage, MirroredStorage
+from write_behind import WriteBehindStorage
+from sheets_scheduler import QuotaExhausted
+from fake_sheets import FakeSheetsClient, create_tracker_spreadsheet
+import task_query
+import bulk_import
+import task_export
+import metrics
+import profiling
+from events import EventHub
+from task_record import Projection
+from fast_json import FastJSONResponse
+from compression import CompressionMiddleware
 
 # Initialize FastAPI app
-app = FastAPI(title="Property Management Tracker API", version="3.0.0-FORCE-DEPLOY")
+app = FastAPI(
+    title="Property Management Tracker API",
+    version="3.0.0-FORCE-DEPLOY",
+    default_response_class=FastJSONResponse
+)
 
 # Add CORS middleware to allow React frontend and Railway
 app.add_middleware(
@@ -28,8 +52,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# gzip/brotli for responses over COMPRESSION_MIN_BYTES; event streams are left alone
+app.add_middleware(CompressionMiddleware, **CompressionMiddleware.settings())
+
+# Opt-in request profiling (PROFILE_ADMIN_TOKEN / PROFILE_SAMPLE_RATE); not installed otherwise
+profiling_options = profiling.profiling_settings()
+if profiling_options:
+    app.add_middleware(profiling.ProfilingMiddleware, **profiling_options)
+
+# Per-endpoint latency, in-flight requests and Sheets round-trips, served at /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Pydantic models for API requests/responses
 # Pydantic models for API requests/responses
 class TaskCreate(BaseModel):
@@ -95,14 +131,14 @@ mock_tasks = [
 ]
 
 # Initialize the tracker (you'll need to handle this per user in production)
-def initialize_tracker():
-    """Initialize tracker with environment variables or local credentials"""
+def open_sheets_storage():
+    """Open Google Sheets storage with environment variables or local credentials"""
     try:
         # Try to get credentials from environment variable (for Railway/Heroku)
         google_creds_json = os.getenv('GOOGLE_CREDENTIALS_JSON')
         spreadsheet_name = os.getenv('SPREADSHEET_NAME', 'Property Management Tracker')
         
-        print(f"🔍 Initializing tracker...")
+        print(f"🔍 Connecting to Google Sheets...")
         print(f"📊 Spreadsheet name: {spreadsheet_name}")
         print(f"🔑 Google credentials available: {bool(google_creds_json)}")
         
@@ -122,13 +158,13 @@ def initialize_tracker():
                 
                 print(f"📁 Temp credentials file created: {temp_creds_path}")
                 
-                tracker = PropertyManagementTracker(temp_creds_path, spreadsheet_name)
-                print("✅ Tracker initialized successfully with environment credentials")
+                storage = GoogleSheetsStorage.from_credentials(temp_creds_path, spreadsheet_name)
+                print("✅ Google Sheets opened successfully with environment credentials")
                 
                 # Clean up temporary file
                 os.unlink(temp_creds_path)
                 
-                return tracker
+                return storage
                 
             except json.JSONDecodeError as e:
                 print(f"❌ JSON decode error: {e}")
@@ -142,25 +178,162 @@ def initialize_tracker():
             local_creds_path = os.path.join(os.path.dirname(__file__), 'credentials.json')
             print(f"📁 Checking local credentials at: {local_creds_path}")
             if os.path.exists(local_creds_path):
-                print("📄 Local credentials file found, initializing tracker...")
+                print("📄 Local credentials file found, opening Google Sheets...")
                 try:
-                    tracker = PropertyManagementTracker(local_creds_path, spreadsheet_name)
-                    print("✅ Tracker initialized successfully with local credentials!")
-                    return tracker
+                    storage = GoogleSheetsStorage.from_credentials(local_creds_path, spreadsheet_name)
+                    print("✅ Google Sheets opened successfully with local credentials!")
+                    return storage
                 except Exception as e:
                     print(f"❌ Error initializing with local credentials: {e}")
                     return None
             else:
                 print("❌ No credentials found (neither environment nor local file)")
-                print("⚠️  App will run with mock data only")
                 return None
                 
+    except Exception as e:
+        print(f"Warning: Could not open Google Sheets: {e}")
+        return None
+
+def initialize_tracker():
+    """Initialize tracker on the storage backend selected by TASK_STORAGE (sheets, sqlite or fake-sheets)"""
+    backend = os.getenv('TASK_STORAGE', 'sheets').lower()
+    print(f"🔍 Initializing tracker with {backend} storage...")
+    
+    try:
+        if backend == 'sqlite':
+            sqlite_path = os.getenv('SQLITE_PATH', 'pmt_tasks.db')
+            storage = SQLiteStorage(sqlite_path)
+            print(f"🗄️  SQLite database: {sqlite_path}")
+            
+            # Optionally keep the spreadsheet up to date for owners
+            if os.getenv('SQLITE_MIRROR_TO_SHEETS', 'false').lower() in ('1', 'true', 'yes'):
+                sheets_storage = open_sheets_storage()
+                if sheets_storage:
+                    storage = MirroredStorage(storage, sheets_storage)
+                    print("🪞 Mirroring task writes to Google Sheets")
+                else:
+                    print("⚠️  Sheets mirror unavailable, using SQLite only")
+        elif backend == 'fake-sheets':
+            # In-process Sheets stand-in for load tests; see FAKE_SHEETS_* settings
+            spreadsheet_name = os.getenv('SPREADSHEET_NAME', 'Property Management Tracker')
+            client = FakeSheetsClient.from_env()
+            create_tracker_spreadsheet(client, spreadsheet_name)
+            storage = GoogleSheetsStorage.from_client(client, spreadsheet_name)
+            print("🧪 Using fake Google Sheets (no data is persisted)")
+        else:
+            storage = open_sheets_storage()
+            if storage is None:
+                print("⚠️  App will run with mock data only")
+                return None
+        
+        # Optionally acknowledge writes from a local journal and batch them to storage
+        if os.getenv('WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes'):
+            journal_path = os.getenv('WRITE_BEHIND_JOURNAL', 'pmt_write_behind.jsonl')
+            storage = WriteBehindStorage(
+                storage,
+                journal_path,
+                max_delay=float(os.getenv('WRITE_BEHIND_MAX_DELAY_MS', '2000')) / 1000,
+                max_batch=int(os.getenv('WRITE_BEHIND_MAX_BATCH', '200')),
+                max_attempts=int(os.getenv('WRITE_BEHIND_MAX_ATTEMPTS', '20'))
+            )
+            print(f"📝 Write-behind enabled, journal: {journal_path}")
+        
+        tracker = PropertyManagementTracker(storage=storage)
+        print("✅ Tracker initialized successfully")
+        return tracker
+        
     except Exception as e:
         print(f"Warning: Could not initialize tracker: {e}")
         return None
 
 tracker = initialize_tracker()
 
+# Tracker calls block on Google Sheets I/O, so they run on a bounded thread pool
+# instead of the event loop; TRACKER_MAX_WORKERS caps concurrent Sheets calls.
+TRACKER_MAX_WORKERS = int(os.getenv('TRACKER_MAX_WORKERS', '8'))
+tracker_executor = ThreadPoolExecutor(
+    max_workers=TRACKER_MAX_WORKERS,
+    thread_name_prefix="tracker-io"
+)
+
+async def run_tracker(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking tracker method on the I/O pool without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    # Carry the request context into the worker so Sheets calls are attributed to it
+    context = contextvars.copy_context()
+    call = profiling.profiled(functools.partial(func, *args, **kwargs))
+    try:
+        return await loop.run_in_executor(tracker_executor, context.run, call)
+    except QuotaExhausted as e:
+        # Tell clients to back off instead of reporting a server fault
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+
+# Clients may keep task and stats responses but must revalidate them with If-None-Match,
+# which costs a 304 and no serialization while the data is unchanged
+DATA_CACHE_CONTROL = "private, no-cache"
+
+async def read_with_etag(request: Request, read: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[str, Any]:
+    """(ETag, tracker read result) from one task view; the result is None when If-None-Match
+    already names this ETag, and the read is skipped"""
+    # The day is part of the tag because overdue tasks change at midnight
+    today = date.today().toordinal()
+    version, result = await run_tracker(
+        tracker.read_versioned,
+        read,
+        *args,
+        unless=lambda version: etag_matches(request, f'W/"{version}-{today}"'),
+        **kwargs
+    )
+    return f'W/"{version}-{today}"', result
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak If-None-Match comparison against the current ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        (tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip()) == bare
+        for tag in header.split(",")
+    )
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": DATA_CACHE_CONTROL})
+
+# Pushes task changes to dashboards over GET /api/events
+event_hub = EventHub()
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv('EVENTS_HEARTBEAT_SECONDS', '15'))
+EVENTS_RETRY_MS = int(os.getenv('EVENTS_RETRY_MS', '3000'))
+
+@app.on_event("startup")
+async def start_event_hub():
+    event_hub.attach(asyncio.get_running_loop())
+    if tracker:
+        tracker.add_change_listener(event_hub.publish)
+
+def task_projection(
+    fields: Optional[str] = Query(None, description="Comma-separated task fields to return"),
+    legacy: bool = Query(False, description="Also return property_address, task_name and description")
+) -> Projection:
+    """Which task fields to send; the legacy duplicate keys are opt-in"""
+    try:
+        return Projection.parse(fields, legacy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.on_event("shutdown")
+async def shutdown_tracker_executor():
+    tracker_executor.shutdown(wait=False)
+    if tracker:
+        # Flushes queued write-behind and mirror writes
+        tracker.storage.close()
+
 @app.get("/")
 async def root():
     return {"message": "Property Management Tracker API v2.2.0 - Stats Fixed", "status": "running"}
@@ -173,6 +346,13 @@ async def get_api_version():
 async def health_check():
     return {"status": "healthy", "tracker_available": tracker is not None}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of request, Sheets and cache metrics"""
+    if tracker:
+        metrics.set_cache_stats(**tracker.cache_stats())
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Task management endpoints
 @app.post("/api/tasks")
 async def create_task(task: TaskCreate):
@@ -211,22 +391,209 @@ async def create_task(task: TaskCreate):
         return {"success": True, "message": "Task added successfully (demo mode)"}
     
     try:
-        result = tracker.add_task_from_api(task.dict())
+        result = await run_tracker(tracker.add_task_from_api, task.dict())
         return {"success": result["success"], "message": result["message"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Tasks written per storage append during a bulk import
+BULK_IMPORT_BATCH_SIZE = int(os.getenv('BULK_IMPORT_BATCH_SIZE', '500'))
+
+@app.post("/api/tasks/bulk")
+async def bulk_import_tasks(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$")
+):
+    """Import tasks from a CSV or NDJSON body, parsed as it streams in and written in batches"""
+    if not tracker:
+        raise HTTPException(status_code=500, detail="Tracker not initialized")
+    
+    if format is None:
+        format = 'csv' if 'csv' in request.headers.get('content-type', '') else 'ndjson'
+    parse = bulk_import.iter_csv if format == 'csv' else bulk_import.iter_ndjson
+    
+    results = []
+    batch = []
+    
+    async def write_batch():
+        if not batch:
+            return
+        try:
+            task_ids = await run_tracker(tracker.add_maintenance_tasks, [task.dict() for _, task in batch])
+            results.extend(
+                {"line": line, "success": True, "id": task_id}
+                for (line, _), task_id in zip(batch, task_ids)
+            )
+        except Exception as e:
+            message = e.detail if isinstance(e, HTTPException) else str(e)
+            results.extend({"line": line, "success": False, "errors": [message]} for line, _ in batch)
+        batch.clear()
+    
+    try:
+        async for line, row in parse(request.stream()):
+            if isinstance(row, str):
+                results.append({"line": line, "success": False, "errors": [row]})
+                continue
+            try:
+                batch.append((line, TaskCreate(**row)))
+            except ValidationError as e:
+                errors = [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+                results.append({"line": line, "success": False, "errors": errors})
+                continue
+            if len(batch) >= BULK_IMPORT_BATCH_SIZE:
+                await write_batch()
+        await write_batch()
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be UTF-8 encoded")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    results.sort(key=lambda result: result["line"])
+    imported = sum(1 for result in results if result["success"])
+    return {
+        "success": imported == len(results),
+        "imported": imported,
+        "failed": len(results) - imported,
+        "results": results
+    }
 
 @app.get("/api/tasks")
-async def get_all_tasks():
-    """Get all tasks with their status"""
+async def get_all_tasks(
+    request: Request,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    property_name: Optional[str] = None,
+    sort_by: Optional[str] = Query(None, description="due_date, priority or estimated_cost"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: str = Query("rows", pattern="^(rows|columnar)$", description="columnar sends one array per field"),
+    projection: Projection = Depends(task_projection)
+):
+    """Get tasks, filtered, sorted and paginated server-side"""
+    query = {
+        "status": status,
+        "category": category,
+        "priority": priority,
+        "property_name": property_name,
+        "sort_by": sort_by,
+        "descending": order == "desc",
+        "limit": limit,
+        "cursor": cursor,
+    }
+    
+    try:
+        headers = {}
+        if not tracker:
+            # Return mock data when tracker is not available
+            result = task_query.query_tasks(mock_tasks, **query)
+        else:
+            # Get matching tasks from the sheet using new standardized format
+            etag, result = await read_with_etag(request, tracker.query_tasks, **query)
+            if result is None:
+                return not_modified(etag)
+            headers = {"ETag": etag, "Cache-Control": DATA_CACHE_CONTROL}
+        tasks = result.pop("tasks")
+        if format == "columnar":
+            body = {"success": True, "format": "columnar", "count": len(tasks), **result, "columns": projection.columns(tasks)}
+        else:
+            body = {"success": True, "tasks": projection.apply(tasks), **result}
+        # Plain dicts already; skip jsonable_encoder's pass over every task
+        return FastJSONResponse(body, headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """Server-sent events for every task change, each with the updated dashboard stats"""
+    queue = event_hub.subscribe()
+    
+    async def messages():
+        try:
+            # Tells EventSource how long to wait before reconnecting
+            yield f"retry: {EVENTS_RETRY_MS}\n\n".encode()
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection and notices clients that left
+                    if await request.is_disconnected():
+                        break
+                    message = b": heartbeat\n\n"
+                yield message
+        finally:
+            event_hub.unsubscribe(queue)
+    
+    return StreamingResponse(
+        messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/tasks/export")
+async def export_tasks(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    property_name: Optional[str] = None,
+    sort_by: Optional[str] = Query(None, description="due_date, priority or estimated_cost"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    projection: Projection = Depends(task_projection)
+):
+    """Stream every matching task as CSV or NDJSON, with the same filters as GET /api/tasks"""
+    query = {
+        "status": status,
+        "category": category,
+        "priority": priority,
+        "property_name": property_name,
+        "sort_by": sort_by,
+        "descending": order == "desc",
+    }
+    
+    try:
+        if not tracker:
+            tasks = task_query.query_tasks(mock_tasks, **query)["tasks"]
+        else:
+            tasks = await run_tracker(tracker.export_tasks, **query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return StreamingResponse(
+        # Projected lazily, row by row, as the stream is written
+        task_export.iter_export(map(projection, tasks), format, projection.names),
+        media_type=task_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    )
+
+@app.get("/api/tasks/changes")
+async def get_task_changes(
+    since: Optional[str] = Query(None, description="version from the last sync"),
+    projection: Projection = Depends(task_projection)
+):
+    """Tasks changed since a sync version, with deleted IDs; omit since to get everything"""
     if not tracker:
-        # Return mock data when tracker is not available
-        return {"success": True, "tasks": mock_tasks}
+        return {"success": True, "version": "mock", "full_resync": True, "tasks": projection.apply(mock_tasks), "deleted": []}
     
     try:
-        # Get all tasks from the sheet using new standardized format
-        all_tasks = tracker.get_all_tasks()
-        return {"success": True, "tasks": all_tasks}
+        changes = await run_tracker(tracker.task_changes, since or "")
+        changes["tasks"] = projection.apply(changes["tasks"])
+        return FastJSONResponse({"success": True, **changes})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -252,72 +619,121 @@ async def update_task(task_id: str, update_data: TaskUpdate):
         raise HTTPException(status_code=404, detail="Task not found")
     
     try:
-        # Extract row number from task_id
-        if str(task_id).startswith('task_'):
-            row_number = int(task_id.split('_')[1])
-        else:
-            row_number = int(task_id) + 1  # Add 1 for header row
-        
         if update_data.status:
-            result = tracker.update_task_status(
-                row_number, 
-                update_data.status, 
+            result = await run_tracker(
+                tracker.update_task_status_by_id,
+                task_id,
+                update_data.status,
                 update_data.completed_date
             )
+            if result is None:
+                raise HTTPException(status_code=404, detail="Task not found")
             return {"success": result["success"], "message": result["message"]}
         else:
             return {"success": False, "message": "No update data provided"}
             
-    except (ValueError, IndexError) as e:
-        raise HTTPException(status_code=400, detail=f"Invalid task ID format: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/tasks/pending")
-async def get_pending_tasks():
+async def get_pending_tasks(projection: Projection = Depends(task_projection)):
     """Get all pending maintenance tasks"""
     if not tracker:
         raise HTTPException(status_code=500, detail="Tracker not initialized")
     
     try:
-        pending_tasks = tracker.get_pending_tasks()
-        return {"success": True, "tasks": pending_tasks}
+        pending_tasks = await run_tracker(tracker.get_pending_tasks)
+        return FastJSONResponse({"success": True, "tasks": projection.apply(pending_tasks)})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/tasks/overdue")
-async def get_overdue_tasks():
+async def get_overdue_tasks(projection: Projection = Depends(task_projection)):
     """Get all overdue tasks"""
     if not tracker:
         raise HTTPException(status_code=500, detail="Tracker not initialized")
     
     try:
-        overdue_tasks = tracker.get_overdue_tasks()
-        return {"success": True, "tasks": overdue_tasks}
+        overdue_tasks = await run_tracker(tracker.get_overdue_tasks)
+        return FastJSONResponse({"success": True, "tasks": projection.apply(overdue_tasks)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/tasks/upcoming")
+async def get_upcoming_tasks(
+    days: int = Query(7, ge=0, le=366),
+    projection: Projection = Depends(task_projection)
+):
+    """Get open tasks due within the next N days"""
+    if not tracker:
+        raise HTTPException(status_code=500, detail="Tracker not initialized")
+    
+    try:
+        upcoming_tasks = await run_tracker(tracker.get_upcoming_tasks, days)
+        return FastJSONResponse({"success": True, "tasks": projection.apply(upcoming_tasks)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/tasks/search")
+async def search_tasks(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=200),
+    projection: Projection = Depends(task_projection)
+):
+    """Search tasks by description and property name"""
+    if not tracker:
+        raise HTTPException(status_code=500, detail="Tracker not initialized")
+    
+    try:
+        matches = await run_tracker(tracker.search_tasks, q, limit)
+        tasks = projection.apply(matches)
+        if not projection.is_default:
+            for task, match in zip(tasks, matches):
+                task["search_score"] = match["search_score"]
+        return FastJSONResponse({"success": True, "tasks": tasks})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/tasks/property/{property_name}")
-async def get_tasks_by_property(property_name: str):
+async def get_tasks_by_property(property_name: str, projection: Projection = Depends(task_projection)):
     """Get all tasks for a specific property"""
     if not tracker:
         raise HTTPException(status_code=500, detail="Tracker not initialized")
     
     try:
-        property_tasks = tracker.get_tasks_by_property(property_name)
-        return {"success": True, "tasks": property_tasks}
+        property_tasks = await run_tracker(tracker.get_tasks_by_property, property_name)
+        return FastJSONResponse({"success": True, "tasks": projection.apply(property_tasks)})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.put("/api/tasks/{row_number}/complete")
-async def mark_task_complete(row_number: int):
-    """Mark a task as complete by row number"""
+@app.put("/api/tasks/{task_id}/complete")
+async def mark_task_complete(task_id: str):
+    """Mark a task as complete by ID, or by sheet row number as this route used to take"""
     if not tracker:
         raise HTTPException(status_code=500, detail="Tracker not initialized")
     
+    if task_id.isdigit():
+        # Deployed clients send the row itself here, not the 0-based index other routes accept
+        task_id = f"task_{task_id}"
     try:
-        result = tracker.mark_task_complete(row_number)
-        return {"success": True, "message": result}
+        result = await run_tracker(tracker.update_task_status_by_id, task_id, "Completed")
+        if result is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return {"success": result["success"], "message": result["message"]}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -328,11 +744,13 @@ async def mark_task_complete_by_description(task_description: str):
         raise HTTPException(status_code=500, detail="Tracker not initialized")
     
     try:
-        row_number = tracker.mark_task_complete_by_description(task_description)
+        row_number = await run_tracker(tracker.mark_task_complete_by_description, task_description)
         if row_number:
             return {"success": True, "message": f"Task completed", "row": row_number}
         else:
             raise HTTPException(status_code=404, detail="Task not found")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -349,17 +767,13 @@ async def delete_task(task_id: str):
         raise HTTPException(status_code=404, detail="Task not found")
     
     try:
-        # Extract row number from task_id
-        if str(task_id).startswith('task_'):
-            row_number = int(task_id.split('_')[1])
-        else:
-            row_number = int(task_id) + 1  # Add 1 for header row
-        
-        result = tracker.delete_task(row_number)
+        result = await run_tracker(tracker.delete_task_by_id, task_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Task not found")
         return {"success": result["success"], "message": result["message"]}
             
-    except (ValueError, IndexError) as e:
-        raise HTTPException(status_code=400, detail=f"Invalid task ID format: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -379,8 +793,10 @@ async def handle_form_response(form_response: FormResponse):
             'Priority': form_response.Priority,
             'Reporter Email': form_response.ReporterEmail
         }
-        result = tracker.add_task_from_form_response(response_dict)
+        result = await run_tracker(tracker.add_task_from_form_response, response_dict)
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -392,11 +808,14 @@ async def process_sms_command(sms_command: SMSCommand):
         raise HTTPException(status_code=500, detail="Tracker not initialized")
     
     try:
-        result = tracker.process_sms_command(
+        result = await run_tracker(
+            tracker.process_sms_command,
             sms_command.sms_text, 
             sms_command.sender_phone
         )
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -408,7 +827,8 @@ async def create_emergency_task(emergency: EmergencyTask):
         raise HTTPException(status_code=500, detail="Tracker not initialized")
     
     try:
-        result = tracker.add_emergency_maintenance_task(
+        result = await run_tracker(
+            tracker.add_emergency_maintenance_task,
             emergency.property_name,
             emergency.task_description,
             emergency.estimated_cost,
@@ -416,6 +836,8 @@ async def create_emergency_task(emergency: EmergencyTask):
             emergency.emergency_type
         )
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -426,8 +848,56 @@ async def get_emergency_cost_analysis():
         raise HTTPException(status_code=500, detail="Tracker not initialized")
     
     try:
-        analysis = tracker.get_emergency_cost_analysis()
+        analysis = await run_tracker(tracker.get_emergency_cost_analysis)
         return {"success": True, "analysis": analysis}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/analytics")
+async def get_task_analytics(
+    group_by: str = Query("property", pattern="^(property|category|status|priority|month)$"),
+    metric: str = Query("estimated_cost", pattern="^(estimated_cost|emergency_cost)$"),
+    percentiles: str = Query("50,90,99", description="comma-separated, each 0-100"),
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    property_name: Optional[str] = None,
+    emergency: Optional[bool] = None,
+    due_from: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    due_to: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    limit: Optional[int] = Query(None, ge=1, le=10000)
+):
+    """Cost totals, means and percentiles grouped by property, category, status, priority or due month"""
+    if not tracker:
+        raise HTTPException(status_code=500, detail="Tracker not initialized")
+    
+    try:
+        points = [float(value) for value in percentiles.split(",") if value.strip()]
+        if any(not 0 <= point <= 100 for point in points):
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="percentiles must be numbers between 0 and 100")
+    
+    try:
+        analytics = await run_tracker(
+            tracker.task_analytics,
+            group_by=group_by,
+            metric=metric,
+            percentiles=points,
+            status=status,
+            category=category,
+            property_name=property_name,
+            emergency=emergency,
+            due_from=due_from,
+            due_to=due_to,
+            limit=limit
+        )
+        return {"success": True, **analytics}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -439,19 +909,22 @@ async def send_email_notification(notification: EmailNotification):
         raise HTTPException(status_code=500, detail="Tracker not initialized")
     
     try:
-        success = tracker.send_confirmation_email(
+        success = await run_tracker(
+            tracker.send_confirmation_email,
             notification.to_email,
             notification.task_description,
             notification.property_name,
             notification.action
         )
         return {"success": success, "message": "Email sent" if success else "Email failed"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Statistics endpoint for React dashboard
 @app.get("/api/stats")
-async def get_dashboard_stats():
+async def get_dashboard_stats(request: Request, response: Response):
     """Get dashboard statistics for React frontend"""
     if not tracker:
         # Return mock stats when tracker is not available
@@ -474,13 +947,19 @@ async def get_dashboard_stats():
         return {"success": True, "stats": stats}
     
     try:
-        stats = tracker.get_dashboard_stats()
+        etag, stats = await read_with_etag(request, tracker.get_dashboard_stats)
+        if stats is None:
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = DATA_CACHE_CONTROL
         return {"success": True, "stats": stats}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting stats: {e}")
         # Return basic stats as fallback
         try:
-            all_tasks = tracker.get_all_tasks()
+            all_tasks = await run_tracker(tracker.get_all_tasks)
             total_tasks = len(all_tasks)
             pending_tasks = len([task for task in all_tasks if task.get('status', '').lower() == 'pending'])
             
@@ -503,4 +982,4 @@ if __name__ == "__main__":
     print("📍 API will be available at: http://localhost:8000")
     print("📚 API documentation at: http://localhost:8000/docs")
     print("⚠️  Note: Some features require Google Sheets credentials")
-    uvicorn.run("api_server:app", host="0.0.0.
\ No newline at end of file
+    uvicorn.run("api_server:app", host="0.0.0.0", port=int(os.getenv("API_PORT", 8000)))
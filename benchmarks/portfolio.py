@@ -0,0 +1,60 @@
+import random
+from datetime import date, timedelta
+from typing import Iterator, List
+
+from task_storage import SHEET_COLUMNS, TASK_ID_HEADER
+
+# Header row of a generated portfolio sheet
+PORTFOLIO_HEADERS = list(SHEET_COLUMNS) + [TASK_ID_HEADER]
+
+# Due dates are spread around a fixed day so runs are comparable over time
+ANCHOR_DATE = date(2025, 10, 1)
+
+_STREETS = ['Oak', 'Maple', 'Cedar', 'Elm', 'Pine', 'Lake', 'Hill', 'Park', 'Main', 'River']
+_SUFFIXES = ['St', 'Ave', 'Blvd', 'Rd', 'Ln']
+_CATEGORIES = ['HVAC', 'Plumbing', 'Electrical', 'Roofing', 'General', 'Other']
+_PRIORITIES = ['High', 'Medium', 'Medium', 'Low']
+_STATUSES = ['Pending', 'Pending', 'In Progress', 'Completed', 'Completed', 'Completed']
+_ACTIONS = ['Inspect', 'Replace', 'Repair', 'Clean', 'Service', 'Test']
+_OBJECTS = [
+    'furnace filter', 'water heater', 'smoke detectors', 'gutters', 'roof flashing',
+    'kitchen faucet', 'breaker panel', 'boiler', 'sump pump', 'window seals',
+]
+
+
+def generate_rows(count: int, seed: int = 42) -> Iterator[List[str]]:
+    """Yield `count` deterministic task rows in PORTFOLIO_HEADERS order"""
+    rng = random.Random(seed)
+    property_count = max(1, count // 20)
+
+    for index in range(count):
+        property_number = rng.randrange(property_count)
+        street = _STREETS[property_number % len(_STREETS)]
+        suffix = _SUFFIXES[property_number % len(_SUFFIXES)]
+        property_address = f"{100 + property_number} {street} {suffix}"
+
+        status = rng.choice(_STATUSES)
+        due = ANCHOR_DATE + timedelta(days=rng.randint(-540, 540))
+        # Mostly the app's MM-DD-YYYY format, with some ISO dates typed in by hand
+        due_text = due.isoformat() if index % 10 == 0 else due.strftime('%m-%d-%Y')
+        completed_text = ''
+        if status == 'Completed':
+            completed_text = (due - timedelta(days=rng.randint(0, 30))).strftime('%m-%d-%Y')
+
+        cost = rng.randint(50, 500000) / 100
+        cost_text = f"${cost:,.2f}" if index % 3 == 0 else str(cost)
+
+        yield [
+            property_address,
+            f"{rng.choice(_ACTIONS)} {rng.choice(_OBJECTS)}",
+            rng.choice(_CATEGORIES),
+            rng.choice(_PRIORITIES),
+            status,
+            due_text,
+            completed_text,
+            cost_text,
+            '',
+            '',
+            '',
+            f"task_{index:012x}",
+        ]
@@ -0,0 +1,230 @@
+"""Benchmarks for the tracker and API hot paths on a synthetic portfolio.
+
+Run from the repository root:
+
+    python -m benchmarks.run --sizes 1000 10000 100000
+    python -m benchmarks.run --sizes 1000000 --repeat 3 --backend sqlite
+    python -m benchmarks.run --output benchmarks/baseline.json       # record a baseline
+    python -m benchmarks.run --compare benchmarks/baseline.json      # exit 1 on regression
+
+--compare refuses (exit 2) a baseline taken with another backend, seed or set of sizes.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.portfolio import PORTFOLIO_HEADERS, generate_rows
+from fake_sheets import FakeSheetsClient
+from management_tracker import PropertyManagementTracker
+from sheets_scheduler import SheetsScheduler
+from task_cache import TaskCache
+from task_storage import GoogleSheetsStorage, SQLiteStorage
+
+SPREADSHEET_NAME = "Benchmark Portfolio"
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def build_tracker(size: int, backend: str, seed: int) -> Tuple[PropertyManagementTracker, Optional[FakeSheetsClient]]:
+    """A tracker over a freshly generated portfolio, with a cache that never expires on its own"""
+    rows = generate_rows(size, seed)
+    client = None
+    if backend == 'sqlite':
+        path = os.path.join(tempfile.mkdtemp(prefix="pmt-bench-"), "tasks.db")
+        storage = SQLiteStorage(path)
+        storage.append_records([dict(zip(PORTFOLIO_HEADERS, row)) for row in rows])
+    else:
+        client = FakeSheetsClient()
+        worksheet = client.create(SPREADSHEET_NAME).add_worksheet("Maintenance Tasks")
+        worksheet.load_rows([PORTFOLIO_HEADERS] + list(rows))
+        # Measure the code, not the quota throttling
+        storage = GoogleSheetsStorage.from_client(client, SPREADSHEET_NAME, SheetsScheduler.unlimited())
+
+    cache = TaskCache(ttl_seconds=float('inf'), max_tasks=None)
+    return PropertyManagementTracker(storage=storage, cache=cache), client
+
+
+def measure(
+    operation: Callable[[], Any],
+    repeat: int,
+    setup: Optional[Callable[[], Any]] = None,
+    client: Optional[FakeSheetsClient] = None
+) -> Dict[str, Any]:
+    """Time `repeat` runs of operation; setup runs untimed before each one"""
+    timings = []
+    calls: Dict[str, int] = {}
+    for _ in range(repeat):
+        if setup:
+            setup()
+        if client:
+            client.reset_calls()
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+        if client:
+            for method, count in client.calls.items():
+                calls[method] = calls.get(method, 0) + count
+
+    result = {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "runs": repeat,
+    }
+    if client:
+        result["sheets_calls_per_op"] = {method: count / repeat for method, count in sorted(calls.items())}
+    return result
+
+
+def tracker_benchmarks(tracker: PropertyManagementTracker) -> List[Tuple[str, Callable[[], Any], Optional[Callable[[], Any]]]]:
+    """(name, operation, setup) for the tracker methods behind the dashboard and SMS flows"""
+    cold = tracker._cache.invalidate
+    return [
+        ("get_all_tasks.cold", tracker.get_all_tasks, cold),
+        ("get_all_tasks.warm", tracker.get_all_tasks, None),
+        ("get_dashboard_stats.cold", tracker.get_dashboard_stats, cold),
+        ("get_dashboard_stats.warm", tracker.get_dashboard_stats, None),
+        ("get_overdue_tasks.warm", tracker.get_overdue_tasks, None),
+        ("mark_task_complete_by_description.warm",
+         lambda: tracker.mark_task_complete_by_description("inspect boiler"), None),
+        ("add_maintenance_task",
+         lambda: tracker.add_maintenance_task("1 Bench St", "Benchmark task", "2025-12-01"), None),
+    ]
+
+
+def api_benchmarks(tracker: PropertyManagementTracker) -> List[Tuple[str, Callable[[], Any], Optional[Callable[[], Any]]]]:
+    """(name, operation, setup) for the FastAPI endpoints, or nothing without httpx"""
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError:
+        print("httpx is not installed; skipping API benchmarks")
+        return []
+
+    os.environ.setdefault('TASK_STORAGE', 'fake-sheets')
+    import api_server
+    api_server.tracker = tracker
+    http = TestClient(api_server.app)
+    new_task = {
+        "property_name": "1 Bench St",
+        "task_description": "Benchmark task",
+        "due_date": "2025-12-01",
+    }
+
+    def call(method: str, url: str, **kwargs: Any) -> Callable[[], Any]:
+        def run() -> None:
+            response = http.request(method, url, **kwargs)
+            response.raise_for_status()
+            response.json()
+        return run
+
+    return [
+        ("api.GET /api/tasks", call("GET", "/api/tasks"), None),
+        ("api.GET /api/tasks?limit=50", call("GET", "/api/tasks?status=Pending&sort_by=due_date&limit=50"), None),
+        ("api.GET /api/stats", call("GET", "/api/stats"), None),
+        ("api.POST /api/tasks", call("POST", "/api/tasks", json=new_task), None),
+    ]
+
+
+def run(sizes: List[int], repeat: int, backend: str, seed: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for size in sizes:
+        print(f"Generating {size:,} tasks ({backend})...")
+        tracker, client = build_tracker(size, backend, seed)
+        tracker.get_all_tasks()
+
+        for name, operation, setup in tracker_benchmarks(tracker) + api_benchmarks(tracker):
+            result = measure(operation, repeat, setup, client)
+            results[f"{name}@{size}"] = result
+            print(f"  {name:<45} {result['median_ms']:>12.3f} ms")
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": backend,
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _sizes(report: Dict[str, Any]) -> List[int]:
+    return sorted({int(key.rsplit("@", 1)[1]) for key in report.get("results", {})})
+
+
+def mismatches(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Settings that differ between two runs, whose timings therefore do not compare"""
+    differences = []
+    for field in ("backend", "seed"):
+        before, after = baseline.get("meta", {}).get(field), current["meta"][field]
+        if before is not None and before != after:
+            differences.append(f"{field}: baseline {before}, current {after}")
+    if _sizes(baseline) != _sizes(current):
+        differences.append(f"sizes: baseline {_sizes(baseline)}, current {_sizes(current)}")
+    return differences
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print median changes against a baseline and return the benchmarks that slowed down"""
+    regressions = []
+    print(f"\n{'benchmark':<55} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key, result in current["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        before, after = previous["median_ms"], result["median_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:<55} {before:>10.3f}ms {after:>10.3f}ms {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark tracker and API hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="portfolio sizes to generate (1000 to 1000000)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--backend", choices=["fake-sheets", "sqlite"], default="fake-sheets")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results.json", help="where to write results")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative median slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    current = run(args.sizes, args.repeat, args.backend, args.seed)
+
+    with open(args.output, "w") as output:
+        json.dump(current, output, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        differences = mismatches(current, baseline)
+        if differences:
+            print(f"\nNot comparing against {args.compare}, the runs differ in")
+            for difference in differences:
+                print(f"  {difference}")
+            return 2
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+import codecs
+import csv
+import io
+import json
+import re
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+
+# A parsed row, or the reason it could not be parsed, with its 1-based line number
+ParsedRow = Tuple[int, Union[Dict[str, Any], str]]
+
+
+def _field_name(header: str) -> str:
+    """'Property Name' / 'property-name' -> 'property_name'"""
+    return re.sub(r'[^a-z0-9]+', '_', header.strip().lower()).strip('_')
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream into lines without holding the whole body"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line[:-1] if line.endswith('\r') else line
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """One JSON object per line; blank lines are skipped"""
+    line_number = 0
+    async for line in _lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, "Expected a JSON object"
+            continue
+        yield line_number, row
+
+
+# Longest CSV record, in characters, before a still-open quoted field is treated as a stray quote
+MAX_CSV_RECORD_CHARS = 64 * 1024
+
+
+def _still_quoted(line: str, quoted: bool) -> bool:
+    """Whether a CSV record is inside a quoted field at the end of this line.
+
+    Follows the csv module: a quote only opens a field when it is the field's first
+    character, so inch marks like 3/4" in unquoted text are literal.
+    """
+    pos = 0
+    while True:
+        if quoted:
+            end = line.find('"', pos)
+            if end < 0:
+                return True
+            if line.startswith('"', end + 1):
+                # "" is an escaped quote inside the field
+                pos = end + 2
+                continue
+            quoted = False
+            pos = end + 1
+        elif line.startswith('"', pos):
+            quoted = True
+            pos += 1
+            continue
+        # Rest of an unquoted (or closed) field is literal up to the next delimiter
+        comma = line.find(',', pos)
+        if comma < 0:
+            return False
+        pos = comma + 1
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """CSV with a header row of task field names; empty cells fall back to the defaults.
+
+    A quoted field that never closes (or grows past MAX_CSV_RECORD_CHARS) is reported
+    on the line it started, and the lines after it are read as records again.
+    """
+    header = None
+    record_lines: List[str] = []
+    record_chars = 0
+    quoted = False
+    start_line = 0
+
+    def parse(text: str) -> Optional[Union[Dict[str, Any], str]]:
+        nonlocal header
+        values = next(csv.reader(io.StringIO(text)), [])
+        if not any(value.strip() for value in values):
+            return None
+        if header is None:
+            header = [_field_name(value) for value in values]
+            return None
+        if len(values) > len(header):
+            return f"Expected {len(header)} columns, found {len(values)}"
+        return {
+            field: value.strip()
+            for field, value in zip(header, values)
+            if field and value.strip()
+        }
+
+    def feed(line_number: int, line: str) -> Iterator[ParsedRow]:
+        """Add one line to the current record, yielding whatever it completes"""
+        nonlocal record_lines, record_chars, quoted, start_line
+        pending = deque([(line_number, line)])
+        while pending:
+            line_number, line = pending.popleft()
+            if not record_lines:
+                start_line = line_number
+            record_lines.append(line)
+            record_chars += len(line) + 1
+            quoted = _still_quoted(line, quoted)
+            if quoted and record_chars <= MAX_CSV_RECORD_CHARS:
+                continue
+            if quoted:
+                # Give up on the record's first line and re-read the ones it swallowed
+                yield start_line, "Unterminated quoted field"
+                pending.extendleft(reversed(list(enumerate(record_lines[1:], start=start_line + 1))))
+                row = None
+            else:
+                row = parse('\n'.join(record_lines))
+            record_lines = []
+            record_chars = 0
+            quoted = False
+            if row is not None:
+                yield start_line, row
+
+    line_number = 0
+    async for line in _lines(chunks):
+        line_number += 1
+        for parsed in feed(line_number, line):
+            yield parsed
+
+    while record_lines:
+        # The file ended inside a quoted field: report where it began and re-read the rest
+        lines = list(enumerate(record_lines[1:], start=start_line + 1))
+        yield start_line, "Unterminated quoted field"
+        record_lines = []
+        record_chars = 0
+        quoted = False
+        for number, line in lines:
+            for parsed in feed(number, line):
+                yield parsed
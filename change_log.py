@@ -0,0 +1,96 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Fields left out of change detection: row numbers shift on every delete above them
+UNTRACKED_FIELDS = frozenset({'row_number'})
+
+
+def content_hash(task: Dict[str, Any]) -> int:
+    return hash(tuple(
+        (field, value) for field, value in task.items() if field not in UNTRACKED_FIELDS
+    ))
+
+
+class ChangeLog:
+    """Which data version last changed each task, for delta syncs.
+
+    Keeps one version per live task and a bounded list of tombstones for deleted
+    ones. A client that last synced before `floor` cannot be given a delta,
+    because the tombstones it would need have been pruned.
+    """
+
+    def __init__(self, max_tombstones: int = 10000) -> None:
+        self.max_tombstones = max_tombstones
+        self._lock = threading.Lock()
+        # task id -> version of its latest create/update
+        self._changed: Dict[str, int] = {}
+        # task id -> version it was deleted at, oldest first
+        self._deleted: "OrderedDict[str, int]" = OrderedDict()
+        # task id -> content hash as of the last reload or write
+        self._hashes: Dict[str, int] = {}
+        self.floor: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "ChangeLog":
+        return cls(max_tombstones=int(os.getenv('CHANGE_LOG_MAX_TOMBSTONES', '10000')))
+
+    def record(self, version: int, task_id: Optional[str], task: Optional[Dict[str, Any]], deleted: bool = False) -> None:
+        """Note a write; task is its content as written, when known"""
+        if not task_id:
+            return
+        with self._lock:
+            if deleted:
+                self._changed.pop(task_id, None)
+                self._hashes.pop(task_id, None)
+                self._deleted.pop(task_id, None)
+                self._deleted[task_id] = version
+                self._prune()
+                return
+            self._deleted.pop(task_id, None)
+            self._changed[task_id] = version
+            if task is not None:
+                self._hashes[task_id] = content_hash(task)
+            else:
+                # Unknown content; the next reload records it again, harmlessly
+                self._hashes.pop(task_id, None)
+
+    def reconcile(self, version: int, tasks: Iterable[Dict[str, Any]]) -> bool:
+        """Record every task a reload found changed or gone, at `version`.
+
+        Returns False when the reload matches what was last seen, in which case
+        the caller should not spend a new version on it.
+        """
+        hashes = {task['id']: content_hash(task) for task in tasks if task.get('id')}
+        with self._lock:
+            previous, self._hashes = self._hashes, hashes
+            if self.floor is None:
+                # Clients syncing from before the first load have data we never saw
+                self.floor = version
+                return True
+            changed = [task_id for task_id, digest in hashes.items() if previous.get(task_id) != digest]
+            deleted = [task_id for task_id in previous if task_id not in hashes]
+            for task_id in changed:
+                self._deleted.pop(task_id, None)
+                self._changed[task_id] = version
+            for task_id in deleted:
+                self._changed.pop(task_id, None)
+                self._deleted.pop(task_id, None)
+                self._deleted[task_id] = version
+            self._prune()
+            return bool(changed or deleted)
+
+    def since(self, version: int) -> Optional[Tuple[List[str], List[str]]]:
+        """(changed ids, deleted ids) after a version, or None if a full resync is needed"""
+        with self._lock:
+            if self.floor is None or version < self.floor:
+                return None
+            changed = [task_id for task_id, at in self._changed.items() if at > version]
+            deleted = [task_id for task_id, at in self._deleted.items() if at > version]
+        return changed, deleted
+
+    def _prune(self) -> None:
+        while len(self._deleted) > self.max_tombstones:
+            _, version = self._deleted.popitem(last=False)
+            self.floor = max(self.floor or 0, version)
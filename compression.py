@@ -0,0 +1,191 @@
+import asyncio
+import gzip
+import os
+import zlib
+from typing import Callable, Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:  # optional; without it clients get gzip
+    brotli = None
+
+# Already compressed, or must reach the client unbuffered (server-sent events)
+SKIP_CONTENT_TYPES = (b"text/event-stream", b"image/", b"application/zip", b"application/gzip")
+
+# Bodies at least this large are compressed on a worker thread instead of the event loop
+THREAD_COMPRESS_BYTES = 256 * 1024
+
+
+def _with_vary(headers: List, value: bytes = b"Accept-Encoding") -> List:
+    """Headers with value added to Vary, merged into any Vary already there"""
+    vary = [existing for name, existing in headers if name == b"vary"]
+    return [(name, existing) for name, existing in headers if name != b"vary"] + [
+        (b"vary", b", ".join(vary + [value]))
+    ]
+
+
+def _compressible(message: dict) -> bool:
+    """Whether a response, from its start message, is one this middleware would encode"""
+    headers = dict(message.get("headers", []))
+    return not (
+        b"content-encoding" in headers
+        or message["status"] in (204, 304)
+        or headers.get(b"content-type", b"").startswith(SKIP_CONTENT_TYPES)
+    )
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """'gzip;q=0.8, br' -> {'gzip': 0.8, 'br': 1.0}"""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            encodings[name.strip().lower()] = quality
+    return encodings
+
+
+class _Encoder:
+    """Incremental gzip or brotli stream"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """Compress a chunk; flush pushes it out now, so streamed rows are not held back"""
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware that brotli- or gzip-encodes responses above a size threshold.
+
+    Single-body responses are compressed in one go; streamed ones (exports) chunk by
+    chunk. Brotli is preferred when the client accepts it and the module is installed.
+    """
+
+    def __init__(self, app: Callable, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @classmethod
+    def settings(cls) -> Dict[str, int]:
+        """Options from COMPRESSION_* environment variables"""
+        return {
+            "minimum_size": int(os.getenv('COMPRESSION_MIN_BYTES', '1024')),
+            "gzip_level": int(os.getenv('COMPRESSION_GZIP_LEVEL', '6')),
+            "brotli_quality": int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4')),
+        }
+
+    def _compress(self, encoding: str, data: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def _choose(self, scope: dict) -> Optional[str]:
+        header = b""
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                header = value
+                break
+        accepted = accepted_encodings(header.decode("latin-1"))
+        if brotli is not None and accepted.get("br", 0) > 0:
+            return "br"
+        if accepted.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose(scope)
+        if encoding is None:
+            async def send_uncompressed(message: dict) -> None:
+                # Another client asking for gzip would get a compressed body, so caches must
+                # not hand this plain one to it
+                if message["type"] == "http.response.start" and _compressible(message):
+                    message = {**message, "headers": _with_vary(list(message.get("headers", [])))}
+                await send(message)
+
+            await self.app(scope, receive, send_uncompressed)
+            return
+
+        start: Optional[dict] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        def response_start(compressed: bool, body_length: Optional[int] = None) -> dict:
+            # Caches must keep compressed and plain variants apart, even for small bodies
+            headers = _with_vary(list(start["headers"]))
+            if compressed:
+                headers = [(name, value) for name, value in headers if name != b"content-length"]
+                headers.append((b"content-encoding", encoding.encode()))
+                if body_length is not None:
+                    headers.append((b"content-length", str(body_length).encode()))
+            return {**start, "headers": headers}
+
+        async def send_compressed(message: dict) -> None:
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                passthrough = not _compressible(message)
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held until the first body chunk shows how big the response is
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body:
+                    # The whole response is in this one message
+                    if len(body) < self.minimum_size:
+                        passthrough = True
+                        await send(response_start(compressed=False))
+                        await send(message)
+                        return
+                    if len(body) >= THREAD_COMPRESS_BYTES:
+                        # zlib and brotli release the GIL, so other requests keep being served
+                        data = await asyncio.get_running_loop().run_in_executor(
+                            None, self._compress, encoding, body
+                        )
+                    else:
+                        data = self._compress(encoding, body)
+                    await send(response_start(compressed=True, body_length=len(data)))
+                    await send({"type": "http.response.body", "body": data})
+                    return
+                encoder = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                await send(response_start(compressed=True))
+
+            if more_body:
+                await send({"type": "http.response.body", "body": encoder.compress(body, flush=True), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": encoder.compress(body) + encoder.finish()})
+
+        await self.app(scope, receive, send_compressed)
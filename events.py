@@ -0,0 +1,77 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before it counts as too slow to keep up
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def format_event(event: Dict[str, Any]) -> bytes:
+    """One server-sent event message; the data version doubles as the event id"""
+    data = json.dumps(event, default=str)
+    return f"id: {event.get('version', '')}\nevent: {event['type']}\ndata: {data}\n\n".encode('utf-8')
+
+
+# Sent instead of whatever a slow subscriber missed; the client should refetch
+RESYNC_MESSAGE = format_event({"type": "resync", "reason": "overflow"})
+
+
+class EventHub:
+    """Fans tracker change events out to event-stream subscribers.
+
+    Events arrive on tracker worker threads and are handed to the event loop, which
+    encodes each one once and queues the bytes for every subscriber. An idle
+    subscriber costs one small queue and nothing else.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Deliver events on this loop; must be called before anything is published"""
+        self._loop = loop
+
+    def subscribe(self) -> asyncio.Queue:
+        """A queue of encoded messages for one client; pass it to unsubscribe when the client leaves"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        metrics.EVENT_SUBSCRIBERS.set(value=len(self._subscribers))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        metrics.EVENT_SUBSCRIBERS.set(value=len(self._subscribers))
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Thread-safe; returns immediately and never blocks the writer"""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._subscribers:
+            return
+        try:
+            loop.call_soon_threadsafe(self._fan_out, event)
+        except RuntimeError:
+            # Loop shut down between the check and the call
+            pass
+
+    def _fan_out(self, event: Dict[str, Any]) -> None:
+        metrics.EVENTS_PUBLISHED.inc(event['type'])
+        if not self._subscribers:
+            return
+        message = format_event(event)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Rather than buffer without bound, replace the backlog with one resync
+                logger.warning("Event subscriber fell behind, sending resync")
+                metrics.EVENT_SUBSCRIBERS_DROPPED.inc()
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_MESSAGE)
@@ -0,0 +1,257 @@
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Any, Optional, Deque
+
+import gspread
+from gspread.utils import numericise_all, a1_to_rowcol, rowcol_to_a1
+
+from task_storage import SHEET_COLUMNS
+
+# Worksheet methods that count against the Sheets read quota; everything else is a write
+READ_METHODS = {'get_all_records', 'get_all_values', 'row_values', 'open', 'worksheet'}
+
+
+class _FakeResponse:
+    """Just enough of requests.Response for gspread.exceptions.APIError"""
+
+    def __init__(self, status_code: int, message: str, status: str) -> None:
+        self.status_code = status_code
+        self._error = {"code": status_code, "message": message, "status": status}
+        self.text = message
+
+    def json(self) -> Dict[str, Any]:
+        return {"error": self._error}
+
+
+class FakeSheetsClient:
+    """In-process stand-in for the gspread client with injectable latency and quota errors"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        reads_per_minute: Optional[int] = None,
+        writes_per_minute: Optional[int] = None,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ) -> None:
+        """latency/jitter are in seconds; quotas mirror Google's per-minute limits"""
+        self.latency = latency
+        self.jitter = jitter
+        self.reads_per_minute = reads_per_minute
+        self.writes_per_minute = writes_per_minute
+        self.error_rate = error_rate
+        self.calls: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._reads: Deque[float] = deque()
+        self._writes: Deque[float] = deque()
+        self._spreadsheets: Dict[str, "FakeSpreadsheet"] = {}
+
+    @classmethod
+    def from_env(cls) -> "FakeSheetsClient":
+        """Configure from FAKE_SHEETS_* environment variables"""
+        def optional_int(name: str) -> Optional[int]:
+            value = os.getenv(name)
+            return int(value) if value else None
+
+        return cls(
+            latency=float(os.getenv('FAKE_SHEETS_LATENCY_MS', '0')) / 1000,
+            jitter=float(os.getenv('FAKE_SHEETS_JITTER_MS', '0')) / 1000,
+            reads_per_minute=optional_int('FAKE_SHEETS_READS_PER_MINUTE'),
+            writes_per_minute=optional_int('FAKE_SHEETS_WRITES_PER_MINUTE'),
+            error_rate=float(os.getenv('FAKE_SHEETS_ERROR_RATE', '0')),
+        )
+
+    def reset_calls(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def _call(self, method: str) -> None:
+        """Count one API round-trip, then apply quota checks and simulated latency"""
+        is_read = method in READ_METHODS
+        with self._lock:
+            self.calls[method] += 1
+            now = time.monotonic()
+            window, limit = (
+                (self._reads, self.reads_per_minute) if is_read
+                else (self._writes, self.writes_per_minute)
+            )
+            while window and now - window[0] >= 60:
+                window.popleft()
+            over_quota = limit is not None and len(window) >= limit
+            if not over_quota:
+                window.append(now)
+            injected = self.error_rate > 0 and self._random.random() < self.error_rate
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+        if delay:
+            time.sleep(delay)
+        if over_quota or injected:
+            self.calls['429'] += 1
+            raise gspread.exceptions.APIError(_FakeResponse(
+                429,
+                f"Quota exceeded for quota metric '{'Read' if is_read else 'Write'} requests'",
+                "RESOURCE_EXHAUSTED"
+            ))
+
+    def create(self, title: str) -> "FakeSpreadsheet":
+        spreadsheet = FakeSpreadsheet(self, title)
+        self._spreadsheets[title] = spreadsheet
+        return spreadsheet
+
+    def open(self, title: str) -> "FakeSpreadsheet":
+        self._call('open')
+        try:
+            return self._spreadsheets[title]
+        except KeyError:
+            raise gspread.SpreadsheetNotFound(title)
+
+
+class FakeSpreadsheet:
+    """A named collection of fake worksheets"""
+
+    def __init__(self, client: FakeSheetsClient, title: str) -> None:
+        self.client = client
+        self.title = title
+        self._worksheets: List["FakeWorksheet"] = [FakeWorksheet(client, "Sheet1")]
+
+    @property
+    def sheet1(self) -> "FakeWorksheet":
+        return self._worksheets[0]
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26) -> "FakeWorksheet":
+        worksheet = FakeWorksheet(self.client, title)
+        self._worksheets.append(worksheet)
+        return worksheet
+
+    def worksheet(self, title: str) -> "FakeWorksheet":
+        self.client._call('worksheet')
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise gspread.WorksheetNotFound(title)
+
+
+class FakeWorksheet:
+    """Worksheet cells held as a list of string rows, like the values API returns them"""
+
+    def __init__(self, client: FakeSheetsClient, title: str, rows: Optional[List[List[Any]]] = None) -> None:
+        self.client = client
+        self.title = title
+        self._rows: List[List[str]] = [[self._cell(value) for value in row] for row in rows or []]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cell(value: Any, user_entered: bool = False) -> str:
+        text = '' if value is None else str(value)
+        # A leading apostrophe forces text when typed in; it is not part of the value
+        if user_entered and text.startswith("'"):
+            return text[1:]
+        return text
+
+    def _set(self, row: int, col: int, value: str) -> None:
+        while len(self._rows) < row:
+            self._rows.append([])
+        cells = self._rows[row - 1]
+        while len(cells) < col:
+            cells.append('')
+        cells[col - 1] = value
+
+    def _last_row(self) -> int:
+        for index in range(len(self._rows), 0, -1):
+            if any(self._rows[index - 1]):
+                return index
+        return 0
+
+    def load_rows(self, rows: List[List[Any]]) -> None:
+        """Replace the sheet contents without counting API calls (test setup)"""
+        with self._lock:
+            self._rows = [[self._cell(value) for value in row] for row in rows]
+
+    def get_all_values(self, **kwargs: Any) -> List[List[str]]:
+        self.client._call('get_all_values')
+        with self._lock:
+            rows = [list(row) for row in self._rows[:self._last_row()]]
+        width = max((len(row) for row in rows), default=0)
+        return [row + [''] * (width - len(row)) for row in rows]
+
+    def row_values(self, row: int, **kwargs: Any) -> List[str]:
+        self.client._call('row_values')
+        with self._lock:
+            values = list(self._rows[row - 1]) if row <= len(self._rows) else []
+        while values and values[-1] == '':
+            values.pop()
+        return values
+
+    def get_all_records(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        self.client._call('get_all_records')
+        with self._lock:
+            rows = [list(row) for row in self._rows[:self._last_row()]]
+        if not rows:
+            return []
+        headers = rows[0]
+        records = []
+        for row in rows[1:]:
+            values = numericise_all(row + [''] * (len(headers) - len(row)), default_blank='')
+            records.append(dict(zip(headers, values)))
+        return records
+
+    def update_cell(self, row: int, col: int, value: Any) -> Dict[str, Any]:
+        self.client._call('update_cell')
+        with self._lock:
+            self._set(row, col, self._cell(value, user_entered=True))
+        return {"updatedRange": f"'{self.title}'!{rowcol_to_a1(row, col)}"}
+
+    def batch_update(self, data: List[Dict[str, Any]], **kwargs: Any) -> Dict[str, Any]:
+        self.client._call('batch_update')
+        user_entered = str(kwargs.get('value_input_option', 'RAW')).upper() == 'USER_ENTERED'
+        with self._lock:
+            for update in data:
+                start = update['range'].split('!')[-1].split(':')[0]
+                first_row, first_col = a1_to_rowcol(start)
+                for row_offset, values in enumerate(update['values']):
+                    for col_offset, value in enumerate(values):
+                        self._set(
+                            first_row + row_offset,
+                            first_col + col_offset,
+                            self._cell(value, user_entered)
+                        )
+        return {"totalUpdatedCells": sum(len(row) for update in data for row in update['values'])}
+
+    def append_row(self, values: List[Any], **kwargs: Any) -> Dict[str, Any]:
+        return self.append_rows([values], **kwargs)
+
+    def append_rows(self, values: List[List[Any]], **kwargs: Any) -> Dict[str, Any]:
+        self.client._call('append_rows')
+        user_entered = str(kwargs.get('value_input_option', 'RAW')).upper() == 'USER_ENTERED'
+        with self._lock:
+            first_row = self._last_row() + 1
+            del self._rows[first_row - 1:]
+            for row in values:
+                self._rows.append([self._cell(value, user_entered) for value in row])
+            last_row = len(self._rows)
+        width = max((len(row) for row in values), default=1)
+        updated_range = f"'{self.title}'!A{first_row}:{rowcol_to_a1(last_row, width)}"
+        return {"updates": {"updatedRange": updated_range, "updatedRows": len(values)}}
+
+    def delete_rows(self, start_index: int, end_index: Optional[int] = None) -> Dict[str, Any]:
+        self.client._call('delete_rows')
+        with self._lock:
+            del self._rows[start_index - 1:end_index or start_index]
+        return {}
+
+
+def create_tracker_spreadsheet(
+    client: FakeSheetsClient,
+    title: str,
+    rows: Optional[List[List[Any]]] = None
+) -> FakeSpreadsheet:
+    """A spreadsheet laid out like PMT-Project, with a 'Maintenance Tasks' worksheet"""
+    spreadsheet = client.create(title)
+    worksheet = spreadsheet.add_worksheet("Maintenance Tasks")
+    worksheet.load_rows([list(SHEET_COLUMNS)] + (rows or []))
+    return spreadsheet
@@ -0,0 +1,40 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib encoder gives the same output, slower
+    orjson = None
+
+
+def _fallback(value: Any) -> Any:
+    """Types the API hands out besides JSON primitives (dates, sets, records)"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, via orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_fallback, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_fallback, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for plain dicts and lists.
+
+    Returned directly from an endpoint, it skips FastAPI's jsonable_encoder pass,
+    which walks and copies every value of a large task list before encoding it.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1167,8 +1167,7 @@ function App() {
       let response;
       if (updateData.status === 'Completed') {
         // Use the specific completion endpoint that exists on Railway
-        const taskRowNumber = parseInt(taskId.toString().replace('task_', '')) || taskId;
-        response = await fetch(`${API_BASE_URL}/api/tasks/${taskRowNumber}/complete`, {
+        response = await fetch(`${API_BASE_URL}/api/tasks/${encodeURIComponent(taskId)}/complete`, {
           method: 'PUT'
         });
       } else {
@@ -1,67 +1,64 @@
-import gspread
-from google.oauth2.service_account import Credentials
-import os
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from datetime import datetime
+from datetime import datetime, date
 import logging
-from typing import Dict, List, Any, Optional
+import re
+import threading
+import uuid
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from task_cache import TaskCache
+from change_log import ChangeLog
+from task_record import TaskRecord
+from row_ingest import RowIngest, parse_sheet_date, parse_currency
+from task_storage import TaskStorage, GoogleSheetsStorage, TASK_ID_HEADER, new_task_id
+from sheets_scheduler import QuotaExhausted, Priority, call_priority
+import task_query
+import task_analytics
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pre-stable-ID clients address tasks as task_<row number>
+LEGACY_TASK_ID = re.compile(r'^task_(\d+)$')
+
 class PropertyManagementTracker:
     """Property Management Tracker for PMT-Project spreadsheet"""
     
-    def __init__(self, credentials_file: str, spreadsheet_name: str) -> None:
-        """Initialize tracker with credentials and spreadsheet name"""
-        if not os.path.exists(credentials_file):
-            raise FileNotFoundError(
-                f"Credentials file not found: {credentials_file}\n"
-                "Please ensure you have:\n"
-                "1. Created a Google Cloud Service Account\n"
-                "2. Downloaded the JSON credentials file\n"
-                "3. Placed it at the specified path\n"
-                "4. Enabled Google Sheets and Google Drive APIs"
-            )
-        
-        # Use google-auth instead of deprecated oauth2client
-        scope = [
-            'https://spreadsheets.google.com/feeds',
-            'https://www.googleapis.com/auth/drive'
-        ]
+    def __init__(
+        self,
+        credentials_file: Optional[str] = None,
+        spreadsheet_name: Optional[str] = None,
+        cache: Optional[TaskCache] = None,
+        storage: Optional[TaskStorage] = None
+    ) -> None:
+        """Initialize tracker with credentials and spreadsheet name, or an explicit storage backend"""
+        self._cache = cache if cache is not None else TaskCache.from_env()
+        self._refresh_lock = threading.Lock()
+        # Held while resolving a task ID to a row and writing to that row
+        self._write_lock = threading.RLock()
+        # Bumped by every write and by reloads that bring in changed rows
+        self._data_version = 0
+        self._change_log = ChangeLog.from_env()
+        self._version_lock = threading.Lock()
+        # Keeps versions from different API workers from ever comparing equal
+        self._version_epoch = uuid.uuid4().hex[:8]
+        self._change_listeners: List[Callable[[Dict[str, Any]], None]] = []
+        # NumPy view of the tasks for analytics, and the data version it reflects
+        self._columns: Optional[task_analytics.TaskColumns] = None
+        self._columns_version: Optional[int] = None
+        self._columns_lock = threading.Lock()
+        # Task view pinned by read_versioned for the reads on this thread
+        self._pinned = threading.local()
+        # Parses sheet rows, remembering each row's result until its content changes
+        self._ingest = RowIngest()
         
-        try:
-            credentials = Credentials.from_service_account_file(
-                credentials_file,
-                scopes=scope
-            )
-            gc = gspread.authorize(credentials)
-            
-            # Open the spreadsheet by name (PMT-Project)
-            self.spreadsheet = gc.open(spreadsheet_name)
-            logger.info(f"Successfully opened spreadsheet: {spreadsheet_name}")
-            
-            # Try to get "Maintenance Tasks" worksheet, fall back to first sheet
-            try:
-                self.tasks_sheet = self.spreadsheet.worksheet("Maintenance Tasks")
-                logger.info("Using 'Maintenance Tasks' worksheet")
-            except gspread.WorksheetNotFound:
-                self.tasks_sheet = self.spreadsheet.sheet1
-                logger.warning("'Maintenance Tasks' worksheet not found, using first sheet")
-                
-        except gspread.SpreadsheetNotFound:
-            raise ValueError(
-                f"Spreadsheet '{spreadsheet_name}' not found.\n"
-                f"Make sure:\n"
-                f"1. The spreadsheet exists\n"
-                f"2. It's named exactly 'PMT-Project'\n"
-                f"3. You've shared it with your service account email"
-            )
-        except Exception as e:
-            raise Exception(f"Failed to initialize tracker: {e}")
+        if storage is None:
+            storage = GoogleSheetsStorage.from_credentials(credentials_file, spreadsheet_name)
+        self.storage = storage
+        # Row numbers in the cache are wrong once the backend finds rows moved under it
+        self.storage.add_rows_changed_listener(self._cache.invalidate)
     
     def _format_date_for_sheet(self, date_str: str) -> str:
         """Convert date to MM-DD-YYYY format for Google Sheets"""
@@ -81,32 +78,11 @@ class PropertyManagementTracker:
     
     def _parse_date_from_sheet(self, date_str: str) -> str:
         """Convert date from sheet format to YYYY-MM-DD for API"""
-        if not date_str:
-            return ''
-        
-        date_str = str(date_str).lstrip("'")
-        
-        try:
-            date_obj = datetime.strptime(date_str, '%m-%d-%Y')
-            return date_obj.strftime('%Y-%m-%d')
-        except ValueError:
-            try:
-                datetime.strptime(date_str, '%Y-%m-%d')
-                return date_str
-            except ValueError:
-                return date_str
+        return parse_sheet_date(str(date_str))
     
     def _convert_to_float(self, value: Any) -> float:
         """Safely convert value to float"""
-        if isinstance(value, (int, float)):
-            return float(value)
-        if isinstance(value, str):
-            try:
-                clean_value = value.replace('$', '').replace(',', '').strip()
-                return float(clean_value) if clean_value else 0.0
-            except (ValueError, AttributeError):
-                return 0.0
-        return 0.0
+        return parse_currency(value)
     
     def add_maintenance_task(
         self, 
@@ -121,29 +97,90 @@ class PropertyManagementTracker:
     ) -> str:
         """Add a new maintenance task to the tracking sheet"""
         try:
-            tasks = self.tasks_sheet.get_all_values()
-            next_row = len(tasks) + 1
-            
-            formatted_date = self._format_date_for_sheet(due_date)
+            record = self._new_task_record(
+                property_name, task_description, due_date, priority,
+                category, estimated_cost, notes, reporter_email
+            )
             
-            # Update cells - matches PMT-Project spreadsheet column order
-            self.tasks_sheet.update_cell(next_row, 1, property_name)
-            self.tasks_sheet.update_cell(next_row, 2, task_description)
-            self.tasks_sheet.update_cell(next_row, 3, category)
-            self.tasks_sheet.update_cell(next_row, 4, priority)
-            self.tasks_sheet.update_cell(next_row, 5, "Pending")
-            self.tasks_sheet.update_cell(next_row, 6, formatted_date)
-            self.tasks_sheet.update_cell(next_row, 8, str(estimated_cost))
-            self.tasks_sheet.update_cell(next_row, 10, notes)
-            self.tasks_sheet.update_cell(next_row, 11, reporter_email)
+            with self._write_lock:
+                next_row = self.storage.append_records([record])
+                task = self._normalize_record(record, next_row)
+                self._cache.insert(task)
+                self._record_changes([task])
+                self._emit_change("task_created", id=task.id, task=task.to_dict())
             
             logger.info(f"Added task: {task_description} for {property_name}")
             return f"Task added: {task_description} for {property_name}"
             
         except Exception as e:
             logger.error(f"Failed to add task: {e}")
+            self._cache.invalidate()
             raise
     
+    def _new_task_record(
+        self,
+        property_name: str,
+        task_description: str,
+        due_date: str,
+        priority: str = "Medium",
+        category: str = "General",
+        estimated_cost: float = 0,
+        notes: str = "",
+        reporter_email: str = ""
+    ) -> Dict[str, Any]:
+        """Sheet record for a new pending task, with a fresh task ID"""
+        return {
+            'Property Address': property_name,
+            'Task Description': task_description,
+            'Category': category,
+            'Priority': priority,
+            'Status': 'Pending',
+            'Due Date': self._format_date_for_sheet(due_date),
+            'Estimated Cost': str(estimated_cost),
+            'Notes': notes,
+            'Reporter Email': reporter_email,
+            TASK_ID_HEADER: new_task_id(),
+        }
+    
+    def add_maintenance_tasks(self, tasks: List[Dict[str, Any]]) -> List[str]:
+        """Add many tasks (API field names) in one storage append; returns their task IDs"""
+        records = [
+            self._new_task_record(
+                property_name=task.get('property_name', ''),
+                task_description=task.get('task_description', ''),
+                due_date=task.get('due_date', ''),
+                priority=task.get('priority', 'Medium'),
+                category=task.get('category', 'General'),
+                estimated_cost=task.get('estimated_cost', 0),
+                notes=task.get('notes', ''),
+                reporter_email=task.get('reporter_email', '')
+            )
+            for task in tasks
+        ]
+        if not records:
+            return []
+        
+        try:
+            # Queue for quota before the write lock, so other writers are not held up meanwhile
+            with call_priority(Priority.BULK), self.storage.reserve_write(), self._write_lock:
+                first_row = self.storage.append_records(records)
+                added = [
+                    self._normalize_record(record, first_row + offset)
+                    for offset, record in enumerate(records)
+                ]
+                for task in added:
+                    self._cache.insert(task)
+                self._record_changes(added)
+                # Too many rows for per-task events; clients refetch instead
+                self._emit_change("resync", reason="bulk_import", count=len(records))
+        except Exception as e:
+            logger.error(f"Failed to add {len(records)} tasks: {e}")
+            self._cache.invalidate()
+            raise
+        
+        logger.info(f"Added {len(records)} tasks in one batch")
+        return [record[TASK_ID_HEADER] for record in records]
+    
     def add_task_from_api(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add task from API request"""
         try:
@@ -158,44 +195,318 @@ class PropertyManagementTracker:
                 reporter_email=task_data.get('reporter_email', '')
             )
             return {"success": True, "message": result}
+        except QuotaExhausted:
+            raise
         except Exception as e:
             logger.error(f"API task creation failed: {e}")
             return {"success": False, "message": f"Error adding task: {str(e)}"}
     
+    def _normalize_record(self, record: Dict[str, Any], row_number: int) -> TaskRecord:
+        """Convert a raw sheet record into the standardized task format"""
+        return self._ingest.normalize(record, row_number)
+    
+    def _fetch_tasks(self, backfill: bool) -> Optional[List[TaskRecord]]:
+        """Load and normalize every task row from storage; unchanged rows reuse their last parse.
+        
+        Rows without an ID get one only when backfill is set, which requires holding
+        _write_lock; otherwise such a fetch returns None for the caller to retry with it.
+        """
+        all_records = self.storage.fetch_records()
+        if any(self._needs_task_id(record) for record in all_records):
+            if not backfill:
+                return None
+            self._backfill_task_ids(all_records)
+        return self._ingest.normalize_all(all_records, first_row=2)
+    
+    @staticmethod
+    def _needs_task_id(record: Dict[str, Any]) -> bool:
+        return not record.get(TASK_ID_HEADER) and any(str(value) for value in record.values())
+    
+    def _backfill_task_ids(self, records: List[Dict[str, Any]]) -> None:
+        """Give rows added directly in the sheet a permanent ID, written in one batch call.
+
+        Caller holds _write_lock, so the rows are still where the fetch found them.
+        """
+        assignments = []
+        for row_number, record in enumerate(records, start=2):
+            if not self._needs_task_id(record):
+                continue
+            record[TASK_ID_HEADER] = new_task_id()
+            assignments.append((row_number, record[TASK_ID_HEADER]))
+        
+        if not assignments:
+            return
+        try:
+            self.storage.assign_task_ids(assignments)
+            logger.info(f"Assigned task IDs to {len(assignments)} rows")
+        except Exception as e:
+            logger.warning(f"Failed to save new task IDs, they will be regenerated: {e}")
+    
+    def _record_changes(
+        self,
+        tasks: List[Dict[str, Any]],
+        task_id: Optional[str] = None,
+        deleted: bool = False
+    ) -> None:
+        """Bump the data version for a write and log which tasks it touched"""
+        with self._version_lock:
+            self._data_version += 1
+            if deleted or not tasks:
+                self._change_log.record(self._data_version, task_id, None, deleted=deleted)
+            for task in tasks:
+                self._change_log.record(self._data_version, task.get('id'), task)
+    
+    def _note_reload(self, tasks: List[Dict[str, Any]]) -> bool:
+        """Bump the data version when a reload finds rows that differ from the last one.
+        
+        Returns whether listeners should be told to resync; the caller does that once the
+        reloaded tasks are being served, so listeners that read back see the new data.
+        """
+        with self._version_lock:
+            first_load = self._change_log.floor is None
+            changed = self._change_log.reconcile(self._data_version + 1, tasks)
+            if changed:
+                self._data_version += 1
+        return changed and not first_load
+    
+    def _version_tag(self) -> str:
+        with self._version_lock:
+            return f"{self._version_epoch}-{self._data_version}"
+    
+    def read_versioned(
+        self,
+        read: Callable[..., Any],
+        *args: Any,
+        unless: Optional[Callable[[str], bool]] = None,
+        **kwargs: Any
+    ) -> Tuple[str, Any]:
+        """(data version, read(*args, **kwargs)) from a single task view.
+        
+        The view is loaded once and pinned for the read, so the result matches the version
+        and an uncached sheet is downloaded once. The version is taken before reading: writes
+        bump it after changing the cache, so a concurrent write can only make the result newer.
+        The read is skipped, returning None, when unless(version) says the caller has it.
+        """
+        view = self._task_view()
+        version = self._version_tag()
+        if unless is not None and unless(version):
+            return version, None
+        self._pinned.view = view
+        try:
+            return version, read(*args, **kwargs)
+        finally:
+            self._pinned.view = None
+    
+    def task_changes(self, since: str) -> Dict[str, Any]:
+        """Tasks created or updated after a data version, and IDs of those deleted.
+        
+        When the version is from another worker or too old for the change log,
+        every task is returned with full_resync set instead.
+        """
+        view = self._task_view()
+        with self._version_lock:
+            current = self._data_version
+            epoch, _, number = since.rpartition('-')
+            delta = None
+            if epoch == self._version_epoch and number.isdigit() and int(number) <= current:
+                delta = self._change_log.since(int(number))
+            version = f"{self._version_epoch}-{current}"
+        
+        if delta is None:
+            return {"version": version, "full_resync": True, "tasks": view.snapshot(), "deleted": []}
+        changed_ids, deleted_ids = delta
+        tasks = [task for task in map(view.get_by_id, changed_ids) if task is not None]
+        tasks.sort(key=lambda task: task['row_number'])
+        return {"version": version, "full_resync": False, "tasks": tasks, "deleted": deleted_ids}
+    
+    def add_change_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call listener(event) after every change; it runs on the writing thread, so keep it quick"""
+        self._change_listeners.append(listener)
+    
+    def remove_change_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+    
+    def _emit_change(self, event_type: str, **payload: Any) -> None:
+        """Tell listeners what changed, with the data version and current dashboard stats"""
+        if not self._change_listeners:
+            return
+        event = {"type": event_type, "version": self._version_tag(), **payload}
+        if self._cache.is_loaded():
+            event["stats"] = self._cache.dashboard_stats()
+        for listener in list(self._change_listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Change listener failed: {e}")
+    
+    def _task_view(self) -> TaskCache:
+        """Return a fresh task cache, reloading it from the sheet when it has expired"""
+        pinned = getattr(self._pinned, 'view', None)
+        if pinned is not None:
+            # Inside read_versioned, which already looked the view up
+            return pinned
+        if self._cache.is_fresh():
+            self._cache.record_lookup(hit=True)
+            return self._cache
+        
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited
+            if self._cache.is_fresh():
+                self._cache.record_lookup(hit=True)
+                return self._cache
+            self._cache.record_lookup(hit=False)
+            tasks = self._fetch_tasks(backfill=False)
+            if tasks is not None:
+                return self._serve_reload(tasks)
+        
+        # Rows added straight in the sheet need IDs, which are written by row number. Reload
+        # holding the write lock (taken first, as in every write path) so no delete shifts
+        # the rows between the fetch and the backfill; this only happens after such edits.
+        with self._write_lock, self._refresh_lock:
+            if self._cache.is_fresh():
+                return self._cache
+            return self._serve_reload(self._fetch_tasks(backfill=True))
+    
+    def _serve_reload(self, tasks: List[TaskRecord]) -> TaskCache:
+        """Load freshly fetched tasks into the cache, or a throwaway view when they cannot be
+        cached, then tell listeners about any changes (caller holds _refresh_lock)"""
+        resync = self._note_reload(tasks)
+        view = self._cache
+        if not self._cache.load(tasks):
+            # Too large (or caching disabled): serve this call from a throwaway view
+            view = TaskCache(ttl_seconds=float('inf'), max_tasks=None)
+            view.load(tasks)
+        if resync:
+            self._emit_change("resync", reason="reload")
+        return view
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Task cache hit/miss counts and size, for /metrics"""
+        return {"hits": self._cache.hits, "misses": self._cache.misses, "size": len(self._cache)}
+    
     def get_all_tasks(self) -> List[Dict[str, Any]]:
         """Get all tasks in standardized format"""
         try:
-            all_records = self.tasks_sheet.get_all_records()
-            
-            normalized_tasks = []
-            for i, record in enumerate(all_records, start=2):
-                normalized_task = {
-                    "id": f"task_{i}",
-                    "row_number": i,
-                    "property_name": record.get('Property Address', ''),
-                    "property_address": record.get('Property Address', ''),
-                    "task_description": record.get('Task Description', ''),
-                    "task_name": record.get('Task Description', ''),
-                    "category": record.get('Category', 'General'),
-                    "priority": record.get('Priority', 'Medium'),
-                    "status": record.get('Status', 'Pending'),
-                    "due_date": self._parse_date_from_sheet(str(record.get('Due Date', ''))),
-                    "completed_date": self._parse_date_from_sheet(str(record.get('Completed Date', ''))),
-                    "estimated_cost": self._convert_to_float(record.get('Estimated Cost', 0)),
-                    "emergency_cost": self._convert_to_float(record.get('Emergency Cost', 0)),
-                    "notes": record.get('Notes', ''),
-                    "description": record.get('Notes', ''),
-                    "reporter_email": record.get('Reporter Email', ''),
-                    "created_date": self._parse_date_from_sheet(str(record.get('Date Created', ''))),
-                }
-                normalized_tasks.append(normalized_task)
-            
-            return normalized_tasks
+            return self._task_view().snapshot()
             
+        except QuotaExhausted:
+            raise
         except Exception as e:
             logger.error(f"Failed to get tasks: {e}")
             return []
     
+    def _candidates(
+        self,
+        status: Optional[str],
+        category: Optional[str],
+        property_name: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Narrow with the hash indexes first; task_query re-checks every filter"""
+        indexed = {
+            field: value
+            for field, value in (
+                ('status', status),
+                ('category', category),
+                ('property_name', property_name),
+            )
+            if value and not (field == 'status' and value.lower() == 'overdue')
+        }
+        return self._task_view().find(**indexed)
+    
+    def query_tasks(
+        self,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        property_name: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Filtered, sorted and paginated task list; raises ValueError on a bad sort or cursor"""
+        result = task_query.query_tasks(
+            self._candidates(status, category, property_name),
+            status=status,
+            category=category,
+            priority=priority,
+            property_name=property_name,
+            sort_by=sort_by,
+            descending=descending,
+            limit=limit,
+            cursor=cursor
+        )
+        result["tasks"] = [task.to_dict() for task in result["tasks"]]
+        return result
+    
+    def export_tasks(
+        self,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        property_name: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Every matching task, sorted, without copying; callers must only read the records"""
+        return task_query.query_tasks(
+            self._candidates(status, category, property_name),
+            status=status,
+            category=category,
+            priority=priority,
+            property_name=property_name,
+            sort_by=sort_by,
+            descending=descending
+        )["tasks"]
+    
+    def _task_id_at(self, row_number: int) -> Optional[str]:
+        """Permanent ID of the task currently at a row, when it is cached"""
+        task = self._cache.get_by_row(row_number)
+        return task['id'] if task else None
+    
+    def resolve_task_id(self, task_id: str) -> Optional[int]:
+        """Current sheet row for a task ID, accepting legacy row-based IDs.
+
+        Stored IDs are looked up first; generated IDs always contain a letter, so they
+        never fall through to the row-number forms.
+        """
+        view = self._task_view()
+        row_number = view.row_for_id(task_id)
+        if row_number is not None:
+            return row_number
+        
+        legacy = LEGACY_TASK_ID.match(task_id)
+        if legacy:
+            row_number = int(legacy.group(1))
+        elif task_id.isdigit():
+            row_number = int(task_id) + 1  # Add 1 for header row
+        else:
+            return None
+        # Rows past the last task are empty, or someone else's by the time we write
+        return row_number if 2 <= row_number <= len(view) + 1 else None
+    
+    def update_task_status_by_id(
+        self,
+        task_id: str,
+        status: str,
+        completed_date: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Update a task's status by ID; None when the ID is unknown"""
+        with self._write_lock:
+            row_number = self.resolve_task_id(task_id)
+            if row_number is None:
+                return None
+            return self.update_task_status(row_number, status, completed_date)
+    
+    def delete_task_by_id(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Delete a task by ID; None when the ID is unknown"""
+        with self._write_lock:
+            row_number = self.resolve_task_id(task_id)
+            if row_number is None:
+                return None
+            return self.delete_task(row_number)
+    
     def update_task_status(
         self, 
         row_number: int, 
@@ -204,30 +515,54 @@ class PropertyManagementTracker:
     ) -> Dict[str, Any]:
         """Update task status and completion date"""
         try:
-            self.tasks_sheet.update_cell(row_number, 5, status)
+            fields: Dict[str, Any] = {'Status': status}
+            changes: Dict[str, Any] = {"status": status}
             
             if status.lower() == 'completed':
                 if not completed_date:
                     completed_date = datetime.now().strftime('%Y-%m-%d')
                 
                 formatted_date = self._format_date_for_sheet(completed_date)
-                self.tasks_sheet.update_cell(row_number, 7, formatted_date)
+                fields['Completed Date'] = formatted_date
+                changes["completed_date"] = self._parse_date_from_sheet(formatted_date)
+            
+            with self._write_lock:
+                task_id = self._task_id_at(row_number)
+                self.storage.update_fields(row_number, task_id, fields)
+                self._cache.update(row_number, changes)
+                task = self._cache.get_by_row(row_number)
+                self._record_changes([task] if task else [], task_id=task_id)
+                self._emit_change("task_updated", id=task_id, changes=changes, task=task)
             
             logger.info(f"Updated task {row_number} to status: {status}")
             return {"success": True, "message": f"Task status updated to {status}"}
             
+        except QuotaExhausted:
+            self._cache.invalidate()
+            raise
         except Exception as e:
             logger.error(f"Failed to update task status: {e}")
+            self._cache.invalidate()
             return {"success": False, "message": f"Failed to update task: {str(e)}"}
     
     def delete_task(self, row_number: int) -> Dict[str, Any]:
         """Delete a task by row number"""
         try:
-            self.tasks_sheet.delete_rows(row_number)
+            with self._write_lock:
+                task_id = self._task_id_at(row_number)
+                self.storage.delete_record(row_number, task_id)
+                self._cache.remove(row_number)
+                self._record_changes([], task_id=task_id, deleted=True)
+                # Rows below the deleted one move up by one
+                self._emit_change("task_deleted", id=task_id, row_number=row_number)
             logger.info(f"Deleted task at row {row_number}")
             return {"success": True, "message": f"Task in row {row_number} deleted successfully"}
+        except QuotaExhausted:
+            self._cache.invalidate()
+            raise
         except Exception as e:
             logger.error(f"Failed to delete task: {e}")
+            self._cache.invalidate()
             return {"success": False, "message": f"Failed to delete task: {str(e)}"}
     
     def mark_task_complete(self, row_number: int) -> str:
@@ -239,67 +574,32 @@ class PropertyManagementTracker:
     
     def get_pending_tasks(self) -> List[Dict[str, Any]]:
         """Get all pending tasks"""
-        all_tasks = self.get_all_tasks()
-        return [task for task in all_tasks if task.get('status', '').lower() == 'pending']
+        return [task.to_dict() for task in self._task_view().find(status='pending')]
     
     def get_overdue_tasks(self) -> List[Dict[str, Any]]:
         """Get all overdue tasks"""
-        all_tasks = self.get_all_tasks()
-        overdue_tasks = []
-        today = datetime.now().date()
-        
-        for task in all_tasks:
-            if task.get('status', '').lower() != 'completed':
-                due_date_str = task.get('due_date', '')
-                if due_date_str:
-                    try:
-                        due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
-                        if due_date < today:
-                            overdue_tasks.append(task)
-                    except ValueError:
-                        continue
-        
-        return overdue_tasks
+        today = date.today().toordinal()
+        overdue_tasks = self._task_view().due_between(float('-inf'), today)
+        # Keep the sheet order callers have always seen
+        overdue_tasks.sort(key=lambda task: task['row_number'])
+        return [task.to_dict() for task in overdue_tasks]
+    
+    def get_upcoming_tasks(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Get open tasks due between today and N days from now, earliest first"""
+        today = date.today().toordinal()
+        return [task.to_dict() for task in self._task_view().due_between(today, today + days + 1)]
     
     def get_tasks_by_property(self, property_name: str) -> List[Dict[str, Any]]:
         """Get all tasks for a specific property"""
-        all_tasks = self.get_all_tasks()
-        return [
-            task for task in all_tasks 
-            if task.get('property_name', '').lower() == property_name.lower()
-        ]
+        return [task.to_dict() for task in self._task_view().find(property_name=property_name)]
     
     def get_dashboard_stats(self) -> Dict[str, Any]:
         """Get comprehensive dashboard statistics"""
         try:
-            all_tasks = self.get_all_tasks()
-            
-            total_tasks = len(all_tasks)
-            pending_tasks = len([t for t in all_tasks if t.get('status', '').lower() == 'pending'])
-            completed_tasks = len([t for t in all_tasks if t.get('status', '').lower() == 'completed'])
-            
-            overdue_tasks = self.get_overdue_tasks()
-            overdue_count = len(overdue_tasks)
-            
-            preventive_cost = sum(
-                t.get('estimated_cost', 0) 
-                for t in all_tasks 
-                if t.get('status', '').lower() == 'completed'
-            )
-            
-            emergency_cost_averted = preventive_cost * 6.0
-            net_savings = emergency_cost_averted - preventive_cost
-            
-            return {
-                "total_tasks": total_tasks,
-                "pending": pending_tasks,
-                "overdue": overdue_count,
-                "completed": completed_tasks,
-                "preventive_cost": round(preventive_cost, 2),
-                "emergency_cost_averted": round(emergency_cost_averted, 2),
-                "net_savings": round(net_savings, 2)
-            }
+            return self._task_view().dashboard_stats()
             
+        except QuotaExhausted:
+            raise
         except Exception as e:
             logger.error(f"Failed to calculate stats: {e}")
             return {
@@ -323,16 +623,19 @@ class PropertyManagementTracker:
             'reporter_email': form_response.get('Reporter Email', form_response.get('ReporterEmail', ''))
         })
     
+    def search_tasks(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Rank tasks by how well their description and property match a free-text query"""
+        return self._task_view().search(query, limit)
+    
     def mark_task_complete_by_description(self, task_description: str) -> Optional[int]:
-        """Mark task complete by description"""
-        all_tasks = self.get_all_tasks()
-        for task in all_tasks:
-            if task_description.lower() in task.get('task_description', '').lower():
-                if task.get('status', '').lower() != 'completed':
-                    row_number = task.get('row_number')
-                    if row_number:
-                        self.mark_task_complete(row_number)
-                        return row_number
+        """Mark the best-matching open task complete by description"""
+        if not task_description.strip():
+            return None
+        task = self._task_view().match_open_task(task_description)
+        if task:
+            row_number = task['row_number']
+            self.mark_task_complete(row_number)
+            return row_number
         return None
     
     def process_sms_command(self, sms_text: str, sender_phone: Optional[str] = None) -> Dict[str, Any]:
@@ -353,8 +656,7 @@ class PropertyManagementTracker:
             return {"success": False, "message": f"Task not found: {content}"}
         
         elif command == "LIST":
-            property_tasks = self.get_tasks_by_property(content)
-            pending = [t for t in property_tasks if t.get('status', '').lower() == 'pending']
+            pending = self._task_view().find(property_name=content, status='pending')
             if pending:
                 task_list = "\n".join([f"- {t.get('task_description', '')}" for t in pending])
                 return {"success": True, "message": f"Pending tasks for {content}:\n{task_list}"}
@@ -400,23 +702,53 @@ class PropertyManagementTracker:
             }
         return result
     
+    def _task_columns(self) -> task_analytics.TaskColumns:
+        """Columnar copy of the tasks, patched from the change log since it was last used.
+        
+        Caller holds _columns_lock, which also keeps the arrays still while it reads them.
+        """
+        view = self._task_view()
+        with self._version_lock:
+            version = self._data_version
+            delta = None
+            if self._columns is not None and self._columns_version is not None:
+                delta = self._change_log.since(self._columns_version)
+        if self._columns is not None and version == self._columns_version:
+            return self._columns
+        
+        columns = self._columns
+        if delta is not None and columns is not None:
+            changed_ids, deleted_ids = delta
+            # Past this many changes, or with too many dead rows, a rebuild is cheaper
+            if len(changed_ids) + len(deleted_ids) > max(1000, len(columns) // 10) or columns.dead_rows > len(columns) // 4:
+                delta = None
+        if delta is None or columns is None:
+            columns = task_analytics.TaskColumns.build(view.values())
+        else:
+            changed = [task for task in map(view.get_by_id, changed_ids) if task is not None]
+            columns.patch(changed, deleted_ids)
+        self._columns = columns
+        self._columns_version = version
+        return columns
+    
+    def task_analytics(self, **options: Any) -> Dict[str, Any]:
+        """Grouped cost sums, means and percentiles; see task_analytics.analyze for options"""
+        with self._columns_lock:
+            return task_analytics.analyze(self._task_columns(), **options)
+    
     def get_emergency_cost_analysis(self) -> Dict[str, Any]:
         """Analyze emergency maintenance costs"""
-        all_tasks = self.get_all_tasks()
-        emergency_tasks = [t for t in all_tasks if '[EMERGENCY]' in t.get('task_description', '')]
+        with self._columns_lock:
+            count, total_estimated, over_2000 = task_analytics.emergency_summary(self._task_columns())
         
-        if not emergency_tasks:
+        if not count:
             return {"message": "No emergency cost data available yet"}
         
-        total_estimated = sum(t.get('estimated_cost', 0) for t in emergency_tasks)
-        avg_estimated = total_estimated / len(emergency_tasks) if emergency_tasks else 0
-        over_2000 = len([t for t in emergency_tasks if t.get('estimated_cost', 0) >= 2000])
-        
         return {
-            "total_emergencies": len(emergency_tasks),
-            "avg_estimated_cost": round(avg_estimated, 2),
+            "total_emergencies": count,
+            "avg_estimated_cost": round(total_estimated / count, 2),
             "over_2000_count": over_2000,
-            "validation_message": f"Data shows {over_2000} of {len(emergency_tasks)} emergencies cost $2,000+"
+            "validation_message": f"Data shows {over_2000} of {count} emergencies cost $2,000+"
         }
 
 if __name__ == "__main__":
@@ -0,0 +1,267 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+# Sheets calls made while serving the current request, by method
+_request_sheets_calls: ContextVar[Optional[Dict[str, int]]] = ContextVar(
+    "request_sheets_calls", default=None
+)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def set_total(self, *label_values: str, value: float) -> None:
+        """Mirror a running count kept elsewhere, which must only ever grow"""
+        with self._lock:
+            self._values[label_values] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that goes up and down per label set"""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values: str, value: float) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    """Bucketed observations with a running sum and count per label set"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._values.items())
+        lines = self.header()
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.label_names, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics exported by /metrics, plus callbacks that refresh gauges at scrape time"""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests served", ("method", "endpoint", "status")
+))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "endpoint")
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("endpoint",)
+))
+HTTP_SHEETS_CALLS = REGISTRY.register(Histogram(
+    "http_request_sheets_calls", "Google Sheets calls made per HTTP request",
+    ("endpoint",), buckets=CALL_COUNT_BUCKETS
+))
+HTTP_SHEETS_CALLS_BY_METHOD = REGISTRY.register(Counter(
+    "http_sheets_calls_total", "Google Sheets calls made while serving HTTP requests",
+    ("endpoint", "method")
+))
+SHEETS_CALLS = REGISTRY.register(Counter(
+    "sheets_calls_total", "Outbound Google Sheets API calls", ("method",)
+))
+SHEETS_LATENCY = REGISTRY.register(Histogram(
+    "sheets_call_duration_seconds", "Google Sheets API call latency", ("method",)
+))
+SHEETS_ROWS_FETCHED = REGISTRY.register(Counter(
+    "sheets_rows_fetched_total", "Task rows downloaded from Google Sheets"
+))
+SHEETS_QUOTA_WAIT = REGISTRY.register(Histogram(
+    "sheets_quota_wait_seconds", "Time Sheets calls waited for a quota token", ("kind",)
+))
+SHEETS_RETRIES = REGISTRY.register(Counter(
+    "sheets_retries_total", "Sheets calls retried after a rate-limit or server error", ("method", "status")
+))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "task_cache_lookups_total", "Task reads served from the cache (hit) or by reloading storage (miss)", ("result",)
+))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "task_cache_hit_ratio", "Share of task reads served without reloading storage"
+))
+CACHE_SIZE = REGISTRY.register(Gauge(
+    "task_cache_tasks", "Tasks currently held in the task cache"
+))
+EVENT_SUBSCRIBERS = REGISTRY.register(Gauge(
+    "event_stream_subscribers", "Clients connected to the server-sent event feed"
+))
+EVENTS_PUBLISHED = REGISTRY.register(Counter(
+    "event_stream_events_total", "Change events published to the event feed", ("type",)
+))
+EVENT_SUBSCRIBERS_DROPPED = REGISTRY.register(Counter(
+    "event_stream_slow_subscribers_total", "Subscribers told to resync because they fell behind"
+))
+
+
+def record_sheets_call(method: str, seconds: float) -> None:
+    """Count one outbound Sheets call, attributing it to the current request if any"""
+    SHEETS_CALLS.inc(method)
+    SHEETS_LATENCY.observe(seconds, method)
+    calls = _request_sheets_calls.get()
+    if calls is not None:
+        calls[method] = calls.get(method, 0) + 1
+
+
+def record_rows_fetched(count: int) -> None:
+    SHEETS_ROWS_FETCHED.inc(amount=count)
+
+
+def set_cache_stats(hits: int, misses: int, size: int) -> None:
+    CACHE_LOOKUPS.set_total("hit", value=hits)
+    CACHE_LOOKUPS.set_total("miss", value=misses)
+    CACHE_HIT_RATIO.set(value=hits / (hits + misses) if hits + misses else 0.0)
+    CACHE_SIZE.set(value=size)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and Sheets calls per endpoint"""
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    def _endpoint(self, scope: dict) -> str:
+        router = scope["app"].router if "app" in scope else None
+        for route in getattr(router, "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", scope["path"])
+        return "unmatched"
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self._endpoint(scope)
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_with_status(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        calls: Dict[str, int] = {}
+        token = _request_sheets_calls.set(calls)
+        HTTP_IN_FLIGHT.inc(endpoint)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_LATENCY.observe(time.perf_counter() - start, method, endpoint)
+            HTTP_IN_FLIGHT.dec(endpoint)
+            HTTP_REQUESTS.inc(method, endpoint, str(status["code"]))
+            HTTP_SHEETS_CALLS.observe(sum(calls.values()), endpoint)
+            for sheets_method, count in calls.items():
+                HTTP_SHEETS_CALLS_BY_METHOD.inc(endpoint, sheets_method, amount=count)
+            _request_sheets_calls.reset(token)
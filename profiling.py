@@ -0,0 +1,152 @@
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Request header carrying PROFILE_ADMIN_TOKEN to profile one request on demand
+PROFILE_HEADER = b"x-profile-token"
+
+# Server-Timing entry -> (file suffix, function name) of the functions whose cumulative time it reports
+PROFILE_SECTIONS: Dict[str, List[Tuple[str, str]]] = {
+    "sheets": [("task_storage.py", "_call")],
+    "normalize": [("management_tracker.py", "_normalize_record"), ("row_ingest.py", "normalize_all")],
+    "dates": [("row_ingest.py", "parse_sheet_date"), ("task_query.py", "due_ordinal")],
+    "serialize": [
+        ("fastapi/routing.py", "serialize_response"),
+        ("starlette/responses.py", "render"),
+        ("fast_json.py", "render"),
+    ],
+}
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+# cProfile hooks one profiler per thread, so only one request profiles the event loop at a time
+_event_loop_busy = threading.Lock()
+
+
+class RequestProfile:
+    """cProfile data for one request, gathered from the event loop and every worker thread it used"""
+
+    def __init__(self) -> None:
+        self._profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def new_profiler(self) -> cProfile.Profile:
+        profiler = cProfile.Profile()
+        with self._lock:
+            self._profilers.append(profiler)
+        return profiler
+
+    def stats(self) -> pstats.Stats:
+        with self._lock:
+            profilers = list(self._profilers)
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        return stats
+
+    @staticmethod
+    def section_seconds(stats: pstats.Stats) -> Dict[str, float]:
+        """Cumulative seconds spent in each PROFILE_SECTIONS group"""
+        totals = {section: 0.0 for section in PROFILE_SECTIONS}
+        for (filename, _, function), (_, _, _, cumulative, _) in stats.stats.items():
+            path = filename.replace("\\", "/")
+            for section, targets in PROFILE_SECTIONS.items():
+                if any(function == name and path.endswith(suffix) for suffix, name in targets):
+                    totals[section] += cumulative
+        return totals
+
+    def server_timing(self, stats: pstats.Stats) -> str:
+        entries = [
+            f"{section};dur={seconds * 1000:.1f}"
+            for section, seconds in self.section_seconds(stats).items()
+        ]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def profiled(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Inside a profiled request, wrap func so its time on a worker thread is profiled too"""
+    profile = _current_profile.get()
+    if profile is None:
+        return func
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        return profile.new_profiler().runcall(func, *args, **kwargs)
+    return run
+
+
+def profiling_settings() -> Optional[Dict[str, Any]]:
+    """ProfilingMiddleware options from PROFILE_* environment variables, or None when disabled"""
+    token = os.getenv('PROFILE_ADMIN_TOKEN', '')
+    sample_rate = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    if not token and sample_rate <= 0:
+        return None
+    return {
+        "admin_token": token,
+        "sample_rate": sample_rate,
+        "output_dir": os.getenv('PROFILE_OUTPUT_DIR') or os.path.join(tempfile.gettempdir(), "pmt-profiles"),
+    }
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that cProfiles selected requests, stores the .prof file and adds Server-Timing"""
+
+    def __init__(self, app: Callable, admin_token: str = "", sample_rate: float = 0.0, output_dir: str = ".") -> None:
+        self.app = app
+        self.admin_token = admin_token.encode()
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _requested(self, scope: dict) -> bool:
+        if self.admin_token:
+            for name, value in scope.get("headers", ()):
+                if name == PROFILE_HEADER and hmac.compare_digest(value, self.admin_token):
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _save(self, stats: pstats.Stats, scope: dict) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        filename = f"{int(time.time() * 1000)}-{scope['method']}-{slug}.prof"
+        stats.dump_stats(os.path.join(self.output_dir, filename))
+        return filename
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+        if not _event_loop_busy.acquire(blocking=False):
+            # Another request is already being profiled on this event loop
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        profiler = profile.new_profiler()
+        token = _current_profile.set(profile)
+
+        async def send_with_timing(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                profiler.disable()
+                stats = profile.stats()
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing(stats).encode()))
+                headers.append((b"x-profile-file", self._save(stats, scope).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            profiler.disable()
+            _current_profile.reset(token)
+            _event_loop_busy.release()
@@ -0,0 +1,149 @@
+import sys
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
+
+from task_record import INTERNED_FIELDS, TASK_FIELDS, TaskRecord
+from task_storage import TASK_ID_HEADER
+
+# Distinct dates and amounts remembered by the parsers; sheets reuse the same few thousand
+PARSE_CACHE_SIZE = 16384
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_sheet_date(value: str) -> str:
+    """Sheet date (MM-DD-YYYY, optionally with a leading apostrophe) -> YYYY-MM-DD.
+
+    Anything else comes back unchanged, minus the apostrophe.
+    """
+    if not value:
+        return ''
+    value = value.lstrip("'")
+    # Fast path for the zero-padded format the tracker writes; slices and int() beat
+    # strptime. Years below 1000 are left to strptime, which formats them differently.
+    if len(value) == 10 and value[2] == '-' and value[5] == '-' and value[6] != '0' and value.isascii():
+        month, day, year = value[:2], value[3:5], value[6:]
+        # int() would also take ' 1', '+1' and '1_2', which strptime reads differently
+        if month.isdigit() and day.isdigit() and year.isdigit():
+            try:
+                date(int(year), int(month), int(day))
+                return f"{year}-{month}-{day}"
+            except ValueError:
+                pass
+    # Looser spellings strptime accepts, such as 1-5-2025
+    try:
+        return datetime.strptime(value, '%m-%d-%Y').strftime('%Y-%m-%d')
+    except ValueError:
+        return value
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_currency_text(value: str) -> float:
+    try:
+        clean_value = value.replace('$', '').replace(',', '').strip()
+        return float(clean_value) if clean_value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def parse_currency(value: Any) -> float:
+    """'$1,250.00' / 1250 -> 1250.0; anything unparseable is 0.0"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        return _parse_currency_text(value)
+    return 0.0
+
+
+def _sheet_date(value: Any) -> str:
+    return parse_sheet_date(str(value))
+
+
+def _as_is(value: Any) -> Any:
+    return value
+
+
+# Sheet column -> (task field, parser, value when the column is missing), in TaskRecord.from_row order
+SHEET_COLUMNS: Tuple[Tuple[str, str, Callable[[Any], Any], Any], ...] = (
+    ('Property Address', 'property_name', _as_is, ''),
+    ('Task Description', 'task_description', _as_is, ''),
+    ('Category', 'category', _as_is, 'General'),
+    ('Priority', 'priority', _as_is, 'Medium'),
+    ('Status', 'status', _as_is, 'Pending'),
+    ('Due Date', 'due_date', _sheet_date, ''),
+    ('Completed Date', 'completed_date', _sheet_date, ''),
+    ('Date Created', 'created_date', _sheet_date, ''),
+    ('Estimated Cost', 'estimated_cost', parse_currency, 0),
+    ('Emergency Cost', 'emergency_cost', parse_currency, 0),
+    ('Notes', 'notes', _as_is, ''),
+    ('Reporter Email', 'reporter_email', _as_is, ''),
+)
+assert tuple(field for _, field, _, _ in SHEET_COLUMNS) == TASK_FIELDS[2:]
+
+
+def _interned(parse: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap a parser so text results are interned, as TaskRecord stores them"""
+    def parse_interned(value: Any) -> Any:
+        result = parse(value)
+        return sys.intern(result) if type(result) is str else result
+    return parse_interned
+
+
+# (sheet column, parser, value when missing); records built with from_row skip TaskRecord's interning
+_COLUMN_PARSERS = tuple(
+    (header, _interned(parse) if field in INTERNED_FIELDS else parse, missing)
+    for header, field, parse, missing in SHEET_COLUMNS
+)
+
+
+class RowIngest:
+    """Turns raw sheet rows into typed task records.
+
+    Parsed rows are memoized by their headers and cell values, so a refresh
+    only parses rows that changed since the previous one; rows that merely moved (after
+    a delete above them) are reused too, since the row number is not part of the key.
+    """
+
+    def __init__(self) -> None:
+        # (headers, cell values) -> (task ID or None, parsed field values in SHEET_COLUMNS order)
+        self._memo: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], Tuple[Any, Tuple[Any, ...]]] = {}
+        self.parsed_rows = 0
+        self.reused_rows = 0
+
+    @staticmethod
+    def _parse(record: Dict[str, Any]) -> Tuple[Any, Tuple[Any, ...]]:
+        return record.get(TASK_ID_HEADER), tuple(
+            parse(record.get(header, missing)) for header, parse, missing in _COLUMN_PARSERS
+        )
+
+    @staticmethod
+    def _record(parsed: Tuple[Any, Tuple[Any, ...]], row_number: int) -> TaskRecord:
+        task_id, values = parsed
+        return TaskRecord.from_row(task_id or f"task_{row_number}", row_number, values)
+
+    def normalize(self, record: Dict[str, Any], row_number: int) -> TaskRecord:
+        """One row, without touching the memo (new rows from writes)"""
+        self.parsed_rows += 1
+        return self._record(self._parse(record), row_number)
+
+    def normalize_all(self, records: List[Dict[str, Any]], first_row: int = 2) -> List[TaskRecord]:
+        """Every row of a fetch; the memo is replaced so it only holds rows still in the sheet"""
+        memo: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], Tuple[Any, Tuple[Any, ...]]] = {}
+        tasks = []
+        headers: Tuple[str, ...] = ()
+        for row_number, record in enumerate(records, start=first_row):
+            # Every row normally has the same headers; share one tuple of them across keys
+            if len(record) != len(headers) or tuple(record) != headers:
+                headers = tuple(record)
+            # The row itself is the key, so only equal rows can share a parse
+            key = (headers, tuple(record.values()))
+            parsed = self._memo.get(key)
+            if parsed is None:
+                parsed = self._parse(record)
+                self.parsed_rows += 1
+            else:
+                self.reused_rows += 1
+            memo[key] = parsed
+            tasks.append(self._record(parsed, row_number))
+        self._memo = memo
+        return tasks
@@ -0,0 +1,234 @@
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Worksheet methods billed against the Sheets read quota; everything else is a write
+SHEETS_READ_METHODS = {'get_all_records', 'get_all_values', 'row_values'}
+
+# Safe to repeat after a 5xx the server may have applied anyway: they set fixed cells to
+# fixed values. Appends, inserts and row deletes are only retried on 429, which is never applied.
+SHEETS_IDEMPOTENT_METHODS = SHEETS_READ_METHODS | {'update_cell', 'update', 'batch_update'}
+
+
+class Priority(IntEnum):
+    """Who gets the next quota token when several calls are waiting (lowest value first)"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+    BULK = 2
+
+
+# Share of each bucket a priority class leaves untouched for the classes above it
+PRIORITY_HEADROOM = {
+    Priority.INTERACTIVE: 0.0,
+    Priority.BACKGROUND: 0.1,
+    Priority.BULK: 0.3,
+}
+
+_call_priority: ContextVar[Priority] = ContextVar("sheets_call_priority", default=Priority.INTERACTIVE)
+
+# Kinds of token taken ahead of time by SheetsScheduler.reserve, spent by the next call of that kind
+_reserved: ContextVar[Optional[List[str]]] = ContextVar("sheets_reserved_quota", default=None)
+
+
+@contextmanager
+def call_priority(priority: Priority) -> Iterator[None]:
+    """Run the enclosed Sheets calls at the given priority (calls default to INTERACTIVE)"""
+    token = _call_priority.set(priority)
+    try:
+        yield
+    finally:
+        _call_priority.reset(token)
+
+
+class QuotaExhausted(Exception):
+    """The Sheets quota will not allow this call soon enough; retry after `retry_after` seconds"""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills at `per_minute` tokens a minute, holding at most `capacity`"""
+
+    def __init__(self, per_minute: float, capacity: float) -> None:
+        self.rate = per_minute / 60
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def seconds_until(self, tokens: float) -> float:
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    return getattr(getattr(error, 'response', None), 'status_code', None)
+
+
+class SheetsScheduler:
+    """Admits outbound Sheets calls through read and write token buckets in priority
+    order, and retries 429s (and 5xx for idempotent calls) with exponential backoff and full jitter."""
+
+    def __init__(
+        self,
+        reads_per_minute: Optional[int] = 300,
+        writes_per_minute: Optional[int] = 300,
+        burst_seconds: float = 15.0,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 32.0,
+        interactive_max_wait: float = 10.0
+    ) -> None:
+        """A None quota disables throttling for that kind of call; burst_seconds sizes each bucket"""
+        self.buckets: Dict[str, Optional[TokenBucket]] = {
+            kind: TokenBucket(per_minute, max(1.0, per_minute * burst_seconds / 60)) if per_minute else None
+            for kind, per_minute in (('read', reads_per_minute), ('write', writes_per_minute))
+        }
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.interactive_max_wait = interactive_max_wait
+        self._condition = threading.Condition()
+        self._waiters: Dict[str, List[Tuple[int, int]]] = {'read': [], 'write': []}
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_env(cls) -> "SheetsScheduler":
+        """Configure from SHEETS_* environment variables"""
+        def optional_int(name: str, default: str) -> Optional[int]:
+            value = os.getenv(name, default)
+            return int(value) if value and int(value) > 0 else None
+
+        return cls(
+            reads_per_minute=optional_int('SHEETS_READS_PER_MINUTE', '300'),
+            writes_per_minute=optional_int('SHEETS_WRITES_PER_MINUTE', '300'),
+            max_retries=int(os.getenv('SHEETS_MAX_RETRIES', '5')),
+            interactive_max_wait=float(os.getenv('SHEETS_INTERACTIVE_MAX_WAIT_MS', '10000')) / 1000,
+        )
+
+    @classmethod
+    def unlimited(cls) -> "SheetsScheduler":
+        """No throttling or retries, e.g. for benchmarks against the fake client"""
+        return cls(reads_per_minute=None, writes_per_minute=None, max_retries=0)
+
+    def _acquire(self, kind: str, priority: Priority, deadline: Optional[float]) -> None:
+        """Block until this call holds a token for `kind`, or raise QuotaExhausted at the deadline"""
+        bucket = self.buckets[kind]
+        if bucket is None:
+            return
+        waiters = self._waiters[kind]
+        ticket = (int(priority), next(self._sequence))
+        # Never more than a full bucket, or small buckets would starve low priorities
+        needed = min(bucket.capacity, 1 + PRIORITY_HEADROOM[priority] * bucket.capacity)
+
+        with self._condition:
+            heapq.heappush(waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    bucket.refill(now)
+                    if waiters[0] == ticket and bucket.tokens >= needed:
+                        bucket.tokens -= 1
+                        return
+                    wait = bucket.seconds_until(needed) if waiters[0] == ticket else bucket.seconds_until(1)
+                    if deadline is not None and now + wait > deadline:
+                        raise QuotaExhausted(
+                            f"Google Sheets {kind} quota exhausted",
+                            retry_after=max(wait, 1.0)
+                        )
+                    # Wake up early when the head of the queue changes
+                    self._condition.wait(max(wait, 0.01))
+            finally:
+                waiters.remove(ticket)
+                heapq.heapify(waiters)
+                self._condition.notify_all()
+
+    def _penalize(self, kind: str) -> None:
+        """After a 429, stop everyone from spending tokens the server says we don't have"""
+        bucket = self.buckets[kind]
+        if bucket is not None:
+            with self._condition:
+                bucket.refill(time.monotonic())
+                bucket.tokens = min(bucket.tokens, 0.0)
+
+    @contextmanager
+    def reserve(self, kind: str) -> Iterator[None]:
+        """Take one `kind` token now, at the current priority, for the first such call in the block.
+
+        Lets a caller wait for quota before taking its own locks, so a low-priority call
+        does not keep other writers waiting on the lock while it queues for a token.
+        """
+        self._acquire(kind, _call_priority.get(), None)
+        token = _reserved.set([kind] + (_reserved.get() or []))
+        try:
+            yield
+        finally:
+            _reserved.reset(token)
+
+    def run(self, method: str, call: Callable[[], Any]) -> Any:
+        """Run one API call once quota allows, retrying rate-limit errors, and server errors
+        when repeating the call is harmless"""
+        kind = 'read' if method in SHEETS_READ_METHODS else 'write'
+        priority = _call_priority.get()
+        started = time.monotonic()
+        deadline = started + self.interactive_max_wait if priority == Priority.INTERACTIVE else None
+        reserved = _reserved.get()
+
+        attempt = 0
+        while True:
+            if attempt == 0 and reserved and kind in reserved:
+                reserved.remove(kind)
+            else:
+                self._acquire(kind, priority, deadline)
+            metrics.SHEETS_QUOTA_WAIT.observe(time.monotonic() - started, kind)
+            try:
+                return call()
+            except Exception as e:
+                status = _status_code(e)
+                if status != 429 and (status is None or status < 500 or method not in SHEETS_IDEMPOTENT_METHODS):
+                    raise
+                metrics.SHEETS_RETRIES.inc(method, str(status))
+                if status == 429:
+                    self._penalize(kind)
+                delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+                out_of_time = deadline is not None and time.monotonic() + delay > deadline
+                if attempt >= self.max_retries or out_of_time:
+                    if status == 429:
+                        raise QuotaExhausted(
+                            f"Google Sheets {kind} quota exhausted after {attempt + 1} attempts",
+                            retry_after=max(delay, 1.0)
+                        ) from e
+                    raise
+                logger.warning(f"Sheets {method} returned {status}, retry {attempt + 1} in {delay:.2f}s")
+                time.sleep(delay)
+                attempt += 1
+                started = time.monotonic()
+
+
+_default_scheduler: Optional[SheetsScheduler] = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler() -> SheetsScheduler:
+    """Process-wide scheduler; Sheets quotas are per project, not per worksheet"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = SheetsScheduler.from_env()
+        return _default_scheduler
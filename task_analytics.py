@@ -0,0 +1,275 @@
+import math
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from task_query import due_ordinal
+
+# Categorical task fields, stored as integer codes into a per-field vocabulary
+CATEGORICAL_FIELDS = ('property_name', 'category', 'status', 'priority')
+
+# group_by value -> column it groups on ('month' is derived from the due date)
+GROUP_FIELDS = {
+    'property': 'property_name',
+    'category': 'category',
+    'status': 'status',
+    'priority': 'priority',
+    'month': 'due_month',
+}
+
+METRICS = ('estimated_cost', 'emergency_cost')
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+# datetime64[D] counts days from 1970-01-01, date.toordinal() from 0001-01-01
+_UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class Vocabulary:
+    """Distinct values of one categorical field and their integer codes"""
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: Any) -> int:
+        value = str(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def matching(self, value: str) -> np.ndarray:
+        """Codes of every value equal to this one, ignoring case"""
+        wanted = value.strip().lower()
+        return np.array(
+            [code for code, known in enumerate(self.values) if known.strip().lower() == wanted],
+            dtype=np.int32
+        )
+
+
+class TaskColumns:
+    """Tasks as NumPy arrays (costs, due dates, categorical codes), one row per task.
+
+    Built once from the cache and then patched row by row as tasks change; deleted
+    tasks are only marked dead, and `dead_rows` tells the owner when to rebuild.
+    """
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.vocabularies = {field: Vocabulary() for field in CATEGORICAL_FIELDS}
+        self.codes = {field: np.zeros(0, dtype=np.int32) for field in CATEGORICAL_FIELDS}
+        self.estimated_cost = np.zeros(0, dtype=np.float64)
+        self.emergency_cost = np.zeros(0, dtype=np.float64)
+        # Day ordinal of the due date, 0 when missing or unparseable
+        self.due = np.zeros(0, dtype=np.int64)
+        self.emergency = np.zeros(0, dtype=bool)
+        self.alive = np.zeros(0, dtype=bool)
+        self.dead_rows = 0
+
+    @classmethod
+    def build(cls, tasks: Iterable[Mapping[str, Any]]) -> "TaskColumns":
+        columns = cls()
+        columns._append(list(tasks))
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.ids) - self.dead_rows
+
+    def _row_values(self, tasks: Sequence[Mapping[str, Any]]) -> Dict[str, np.ndarray]:
+        """Column arrays for a batch of tasks; due dates are parsed once per distinct string"""
+        due_codes = Vocabulary()
+        due_index = np.fromiter(
+            (due_codes.code(task.get('due_date') or '') for task in tasks), dtype=np.int32, count=len(tasks)
+        )
+        due_days = np.array([due_ordinal(value) or 0 for value in due_codes.values], dtype=np.int64)
+        values = {
+            'estimated_cost': np.fromiter(
+                (_cost(task.get('estimated_cost')) for task in tasks), dtype=np.float64, count=len(tasks)
+            ),
+            'emergency_cost': np.fromiter(
+                (_cost(task.get('emergency_cost')) for task in tasks), dtype=np.float64, count=len(tasks)
+            ),
+            'due': due_days[due_index] if len(tasks) else np.zeros(0, dtype=np.int64),
+            'emergency': np.fromiter(
+                ('[EMERGENCY]' in str(task.get('task_description', '')) for task in tasks), dtype=bool, count=len(tasks)
+            ),
+        }
+        for field, vocabulary in self.vocabularies.items():
+            values[field] = np.fromiter(
+                (vocabulary.code(task.get(field, '')) for task in tasks), dtype=np.int32, count=len(tasks)
+            )
+        return values
+
+    def _append(self, tasks: Sequence[Mapping[str, Any]]) -> None:
+        if not tasks:
+            return
+        values = self._row_values(tasks)
+        for task in tasks:
+            self.positions[task['id']] = len(self.ids)
+            self.ids.append(task['id'])
+        for field in CATEGORICAL_FIELDS:
+            self.codes[field] = np.concatenate([self.codes[field], values[field]])
+        for name in ('estimated_cost', 'emergency_cost', 'due', 'emergency'):
+            setattr(self, name, np.concatenate([getattr(self, name), values[name]]))
+        self.alive = np.concatenate([self.alive, np.ones(len(tasks), dtype=bool)])
+
+    def patch(self, changed: Sequence[Mapping[str, Any]], deleted: Iterable[str]) -> None:
+        """Apply created/updated tasks and deletions in place"""
+        for task_id in deleted:
+            position = self.positions.pop(task_id, None)
+            if position is not None and self.alive[position]:
+                self.alive[position] = False
+                self.dead_rows += 1
+
+        updates = [task for task in changed if task['id'] in self.positions]
+        if updates:
+            rows = np.array([self.positions[task['id']] for task in updates], dtype=np.int64)
+            values = self._row_values(updates)
+            for field in CATEGORICAL_FIELDS:
+                self.codes[field][rows] = values[field]
+            for name in ('estimated_cost', 'emergency_cost', 'due', 'emergency'):
+                getattr(self, name)[rows] = values[name]
+        self._append([task for task in changed if task['id'] not in self.positions])
+
+    def group_keys(self, group_by: str) -> Tuple[np.ndarray, np.ndarray, Callable[[int], str]]:
+        """(key per row, rows that have a key, key -> label) for a GROUP_FIELDS name"""
+        field = GROUP_FIELDS[group_by]
+        if field == 'due_month':
+            has_due = self.due > 0
+            # Months since 1970-01, which sort chronologically
+            months = (self.due - _UNIX_EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+            return months, has_due, lambda key: str(np.datetime64(key, 'M'))
+        return self.codes[field], np.ones(len(self.ids), dtype=bool), self.vocabularies[field].values.__getitem__
+
+
+def _cost(value: Any) -> float:
+    try:
+        cost = float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    # gspread hands back inf/nan for cells like "inf"; one would poison every sum
+    return cost if math.isfinite(cost) else 0.0
+
+
+def _percentiles(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray, percent: float) -> np.ndarray:
+    """Linear-interpolated percentile of every group at once; groups are contiguous runs"""
+    position = starts + (counts - 1) * (percent / 100)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _summary(values: np.ndarray, percentiles: Sequence[float]) -> Dict[str, Any]:
+    if not len(values):
+        return {"count": 0, "sum": 0.0, "mean": 0.0, **{f"p{p:g}": 0.0 for p in percentiles}}
+    return {
+        "count": int(len(values)),
+        "sum": round(float(values.sum()), 2),
+        "mean": round(float(values.mean()), 2),
+        **{f"p{p:g}": round(float(np.percentile(values, p)), 2) for p in percentiles},
+    }
+
+
+def analyze(
+    columns: TaskColumns,
+    group_by: str = 'property',
+    metric: str = 'estimated_cost',
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    property_name: Optional[str] = None,
+    emergency: Optional[bool] = None,
+    due_from: Optional[str] = None,
+    due_to: Optional[str] = None,
+    limit: Optional[int] = None,
+    today: Optional[int] = None
+) -> Dict[str, Any]:
+    """Cost sums, means and percentiles per group, plus open/completed/overdue counts.
+
+    Groups are sorted by total cost (months chronologically); raises ValueError on
+    an unknown group, metric or date.
+    """
+    if group_by not in GROUP_FIELDS:
+        raise ValueError(f"group_by must be one of: {', '.join(GROUP_FIELDS)}")
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of: {', '.join(METRICS)}")
+    today = today if today is not None else date.today().toordinal()
+
+    completed_codes = columns.vocabularies['status'].matching('completed')
+    completed = np.isin(columns.codes['status'], completed_codes)
+    overdue = ~completed & (columns.due > 0) & (columns.due < today)
+
+    mask = columns.alive.copy()
+    if status:
+        if status.lower() == 'overdue':
+            mask &= overdue
+        else:
+            mask &= np.isin(columns.codes['status'], columns.vocabularies['status'].matching(status))
+    for field, value in (('category', category), ('property_name', property_name)):
+        if value:
+            mask &= np.isin(columns.codes[field], columns.vocabularies[field].matching(value))
+    if emergency is not None:
+        mask &= columns.emergency if emergency else ~columns.emergency
+    for bound, keep in ((due_from, np.greater_equal), (due_to, np.less_equal)):
+        if bound:
+            day = due_ordinal(bound)
+            if day is None:
+                raise ValueError(f"Invalid date: {bound} (expected YYYY-MM-DD)")
+            mask &= (columns.due > 0) & keep(columns.due, day)
+
+    keys, has_key, label = columns.group_keys(group_by)
+    values = getattr(columns, metric)
+    totals = _summary(values[mask], percentiles)
+    mask &= has_key
+
+    rows = np.flatnonzero(mask)
+    group_values = values[rows]
+    group_codes, inverse = np.unique(keys[rows], return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(group_codes))
+    sums = np.bincount(inverse, weights=group_values, minlength=len(group_codes))
+    open_counts = np.bincount(inverse, weights=~completed[rows], minlength=len(group_codes))
+    overdue_counts = np.bincount(inverse, weights=overdue[rows], minlength=len(group_codes))
+
+    # Sort by group, then value, so each group's values are one ascending run
+    order = np.lexsort((group_values, inverse))
+    sorted_values = group_values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+    group_percentiles = {
+        f"p{p:g}": _percentiles(sorted_values, starts, counts, p) if len(rows) else np.zeros(0)
+        for p in percentiles
+    }
+
+    groups = [
+        {
+            "key": label(code),
+            "count": int(counts[index]),
+            "open": int(open_counts[index]),
+            "completed": int(counts[index] - open_counts[index]),
+            "overdue": int(overdue_counts[index]),
+            "sum": round(float(sums[index]), 2),
+            "mean": round(float(sums[index] / counts[index]), 2),
+            **{name: round(float(result[index]), 2) for name, result in group_percentiles.items()},
+        }
+        for index, code in enumerate(group_codes.tolist())
+    ]
+    if group_by != 'month':
+        groups.sort(key=lambda group: (-group["sum"], group["key"]))
+
+    return {
+        "group_by": group_by,
+        "metric": metric,
+        "group_count": len(groups),
+        "groups": groups[:limit] if limit else groups,
+        "totals": totals,
+    }
+
+
+def emergency_summary(columns: TaskColumns, threshold: float = 2000.0) -> Tuple[int, float, int]:
+    """(emergency tasks, their total estimated cost, how many cost at least threshold)"""
+    mask = columns.alive & columns.emergency
+    costs = columns.estimated_cost[mask]
+    return int(mask.sum()), float(costs.sum()), int((costs >= threshold).sum())
@@ -0,0 +1,256 @@
+import os
+import threading
+import time
+import logging
+from typing import Dict, List, Any, Optional
+from task_stats import TaskStats
+from task_index import HashIndex, DueDateIndex, TextIndex
+from task_record import TaskRecord
+
+# Task fields with an equality index, for per-property/status/category lookups
+INDEXED_FIELDS = ('property_name', 'status', 'category')
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCache:
+    """Write-through in-memory cache of normalized tasks, kept in sheet row order"""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_tasks: Optional[int] = 50000) -> None:
+        """Create an empty cache; a ttl of 0 disables caching entirely"""
+        self.ttl_seconds = ttl_seconds
+        self.max_tasks = max_tasks
+        self._lock = threading.RLock()
+        # slot -> task; slots are internal keys that survive row shifts
+        self._tasks: Dict[int, TaskRecord] = {}
+        # (row_number - 2) -> slot
+        self._rows: List[int] = []
+        # task id -> slot; the row number lives on the task and shifts on delete
+        self._ids: Dict[str, int] = {}
+        self._next_slot = 0
+        self._loaded_at: Optional[float] = None
+        self._stats = TaskStats()
+        self._indexes = {field: HashIndex(field) for field in INDEXED_FIELDS}
+        self._due_dates = DueDateIndex()
+        self._text = TextIndex()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "TaskCache":
+        """Build a cache configured by TASK_CACHE_TTL_SECONDS / TASK_CACHE_MAX_TASKS"""
+        ttl_seconds = float(os.getenv('TASK_CACHE_TTL_SECONDS', '30'))
+        max_tasks = int(os.getenv('TASK_CACHE_MAX_TASKS', '50000'))
+        return cls(ttl_seconds=ttl_seconds, max_tasks=max_tasks)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def is_fresh(self) -> bool:
+        """True when the cache holds a load younger than the TTL; not counted as a lookup"""
+        with self._lock:
+            return (
+                self._loaded_at is not None
+                and time.monotonic() - self._loaded_at < self.ttl_seconds
+            )
+
+    def record_lookup(self, hit: bool) -> None:
+        """Count one read as served from the cache or by reloading storage"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def is_loaded(self) -> bool:
+        """True while the cache holds a load, expired or not; not counted as a lookup"""
+        with self._lock:
+            return self._loaded_at is not None
+
+    def load(self, tasks: List[TaskRecord]) -> bool:
+        """Replace the contents with a full task list; False if it exceeds the size bound"""
+        with self._lock:
+            self.invalidate()
+            if self.ttl_seconds <= 0:
+                return False
+            if self.max_tasks is not None and len(tasks) > self.max_tasks:
+                logger.warning(
+                    f"Task cache disabled: {len(tasks)} tasks exceeds limit of {self.max_tasks}"
+                )
+                return False
+            for task in tasks:
+                if not isinstance(task, TaskRecord):
+                    task = TaskRecord.from_mapping(task)
+                self._append(task, index_due_date=False)
+            self._due_dates.add_many(self._tasks.items())
+            self._loaded_at = time.monotonic()
+            return True
+
+    def invalidate(self) -> None:
+        """Drop the cached tasks so the next read goes back to the sheet"""
+        with self._lock:
+            self._tasks = {}
+            self._rows = []
+            self._ids = {}
+            self._loaded_at = None
+            self._stats = TaskStats()
+            self._indexes = {field: HashIndex(field) for field in INDEXED_FIELDS}
+            self._due_dates = DueDateIndex()
+            self._text = TextIndex()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Copies of all cached tasks in row order"""
+        with self._lock:
+            return [task.to_dict() for task in self._tasks.values()]
+
+    def values(self) -> List[TaskRecord]:
+        """The cached task records themselves, in row order; callers must not mutate them"""
+        with self._lock:
+            return list(self._tasks.values())
+
+    def find(self, **criteria: Any) -> List[TaskRecord]:
+        """Cached tasks (not copies) whose indexed fields equal the given values, in row order"""
+        with self._lock:
+            slot_sets = sorted(
+                (self._indexes[field].lookup(value) for field, value in criteria.items()),
+                key=len
+            )
+            if not slot_sets:
+                return list(self._tasks.values())
+            matches = set(slot_sets[0])
+            for slots in slot_sets[1:]:
+                matches.intersection_update(slots)
+                if not matches:
+                    break
+            # Slots grow with row order, so sorting them restores sheet order
+            return [self._tasks[slot] for slot in sorted(matches)]
+
+    def due_between(self, start: float, end: float) -> List[TaskRecord]:
+        """Cached open tasks (not copies) due on day ordinals start <= day < end, earliest first"""
+        with self._lock:
+            return [self._tasks[slot] for slot in self._due_dates.due_between(start, end)]
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Copies of the best matching tasks for a free-text query, each with a search_score"""
+        with self._lock:
+            results = []
+            for score, slot in self._text.search(query)[:limit]:
+                task = self._tasks[slot].to_dict()
+                task['search_score'] = score
+                results.append(task)
+            return results
+
+    def match_open_task(self, description: str) -> Optional[Dict[str, Any]]:
+        """Best open task whose description contains the text; exact, then prefix, then shortest"""
+        needle = description.lower()
+        with self._lock:
+            candidates = [
+                self._tasks[slot] for slot in self._text.containing(needle)
+                if needle in str(self._tasks[slot].get('task_description', '')).lower()
+                and str(self._tasks[slot].get('status', '')).lower() != 'completed'
+            ]
+            if not candidates:
+                return None
+
+            def rank(task: TaskRecord) -> tuple:
+                text = str(task.get('task_description', '')).lower()
+                return (text != needle, not text.startswith(needle), len(text), task['row_number'])
+
+            return min(candidates, key=rank).to_dict()
+
+    def dashboard_stats(self) -> Dict[str, Any]:
+        """Dashboard counters maintained incrementally alongside the cached tasks"""
+        with self._lock:
+            return self._stats.snapshot()
+
+    def next_row_number(self) -> int:
+        """Sheet row the next appended task is expected to land on"""
+        with self._lock:
+            return len(self._rows) + 2
+
+    def get_by_row(self, row_number: int) -> Optional[Dict[str, Any]]:
+        """Copy of the task at a sheet row, if cached"""
+        with self._lock:
+            slot = self._slot_for_row(row_number)
+            return self._tasks[slot].to_dict() if slot is not None else None
+
+    def get_by_id(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Copy of a task by its id, if cached"""
+        with self._lock:
+            slot = self._ids.get(task_id)
+            return self._tasks[slot].to_dict() if slot is not None else None
+
+    def row_for_id(self, task_id: str) -> Optional[int]:
+        """Current sheet row of a task id, if cached"""
+        with self._lock:
+            slot = self._ids.get(task_id)
+            return self._tasks[slot]['row_number'] if slot is not None else None
+
+    def insert(self, task: Dict[str, Any]) -> None:
+        """Record a task that was appended to the end of the sheet"""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            if task.get('row_number') != self.next_row_number():
+                # The sheet grew behind our back; let the next read reload it
+                self.invalidate()
+                return
+            self._append(TaskRecord.from_mapping(task))
+
+    def update(self, row_number: int, changes: Dict[str, Any]) -> None:
+        """Apply field changes made to a sheet row"""
+        with self._lock:
+            slot = self._slot_for_row(row_number)
+            if slot is None:
+                self.invalidate()
+                return
+            task = self._tasks[slot]
+            self._unindex(slot, task)
+            task.update(changes)
+            self._index(slot, task)
+
+    def remove(self, row_number: int) -> None:
+        """Drop a deleted sheet row and shift the rows below it up by one"""
+        with self._lock:
+            slot = self._slot_for_row(row_number)
+            if slot is None:
+                self.invalidate()
+                return
+            task = self._tasks.pop(slot)
+            self._unindex(slot, task)
+            self._ids.pop(task.get('id'), None)
+            offset = row_number - 2
+            del self._rows[offset]
+            for later_offset in range(offset, len(self._rows)):
+                self._tasks[self._rows[later_offset]]['row_number'] = later_offset + 2
+
+    def _append(self, task: TaskRecord, index_due_date: bool = True) -> None:
+        slot = self._next_slot
+        self._next_slot += 1
+        self._tasks[slot] = task
+        self._rows.append(slot)
+        self._ids[task['id']] = slot
+        self._index(slot, task, index_due_date)
+
+    def _index(self, slot: int, task: TaskRecord, index_due_date: bool = True) -> None:
+        self._stats.add(task)
+        if index_due_date:
+            self._due_dates.add(slot, task)
+        self._text.add(slot, task)
+        for index in self._indexes.values():
+            index.add(slot, task)
+
+    def _unindex(self, slot: int, task: TaskRecord) -> None:
+        self._stats.remove(task)
+        self._due_dates.remove(slot, task)
+        self._text.remove(slot, task)
+        for index in self._indexes.values():
+            index.remove(slot, task)
+
+    def _slot_for_row(self, row_number: int) -> Optional[int]:
+        if self._loaded_at is None:
+            return None
+        offset = row_number - 2
+        if 0 <= offset < len(self._rows):
+            return self._rows[offset]
+        return None
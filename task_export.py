@@ -0,0 +1,54 @@
+import csv
+import io
+from typing import Any, Dict, Iterable, Iterator, Sequence
+
+from fast_json import dumps
+from task_record import TASK_FIELDS
+
+# Default columns of a CSV export, in order
+EXPORT_FIELDS = TASK_FIELDS
+
+# Rows serialized per chunk handed to the socket
+CHUNK_ROWS = 500
+
+MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def iter_csv(tasks: Iterable[Dict[str, Any]], columns: Sequence[str] = EXPORT_FIELDS) -> Iterator[bytes]:
+    """Encode tasks as CSV a chunk at a time, so memory stays flat however many rows there are"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+    for task in tasks:
+        writer.writerow([task.get(field, '') for field in columns])
+        rows += 1
+        if rows % CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_ndjson(tasks: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """One JSON object per line, with the same fields as GET /api/tasks"""
+    lines = []
+    for task in tasks:
+        lines.append(dumps(task))
+        if len(lines) == CHUNK_ROWS:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+def iter_export(
+    tasks: Iterable[Dict[str, Any]],
+    format: str,
+    columns: Sequence[str] = EXPORT_FIELDS
+) -> Iterator[bytes]:
+    return iter_csv(tasks, columns) if format == 'csv' else iter_ndjson(tasks)
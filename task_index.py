@@ -0,0 +1,160 @@
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Set, Any, Optional, Tuple
+from task_query import due_ordinal
+
+
+def normalize_key(value: Any) -> str:
+    """Index key for a field value; lookups are case-insensitive like the old scans"""
+    return str(value if value is not None else '').lower()
+
+
+class HashIndex:
+    """Maps the normalized value of one task field to the cache slots holding it"""
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self._slots: Dict[str, Set[int]] = {}
+
+    def add(self, slot: int, task: Dict[str, Any]) -> None:
+        key = normalize_key(task.get(self.field, ''))
+        self._slots.setdefault(key, set()).add(slot)
+
+    def remove(self, slot: int, task: Dict[str, Any]) -> None:
+        key = normalize_key(task.get(self.field, ''))
+        slots = self._slots.get(key)
+        if slots is None:
+            return
+        slots.discard(slot)
+        if not slots:
+            del self._slots[key]
+
+    def lookup(self, value: Any) -> Set[int]:
+        """Slots whose field equals value; the returned set must not be mutated"""
+        return self._slots.get(normalize_key(value), set())
+
+
+class DueDateIndex:
+    """Open tasks ordered by due date, for overdue and due-within-N-days range queries"""
+
+    def __init__(self) -> None:
+        # Sorted (due-date ordinal, slot) pairs; completed and undated tasks are left out
+        self._entries: List[Tuple[int, int]] = []
+
+    @staticmethod
+    def _entry(slot: int, task: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        if normalize_key(task.get('status', '')) == 'completed':
+            return None
+        due = due_ordinal(task.get('due_date', ''))
+        return (due, slot) if due is not None else None
+
+    def add(self, slot: int, task: Dict[str, Any]) -> None:
+        entry = self._entry(slot, task)
+        if entry is not None:
+            insort(self._entries, entry)
+
+    def add_many(self, items: Iterable[Tuple[int, Dict[str, Any]]]) -> None:
+        """Bulk add (slot, task) pairs with one sort instead of an insort each"""
+        for slot, task in items:
+            entry = self._entry(slot, task)
+            if entry is not None:
+                self._entries.append(entry)
+        self._entries.sort()
+
+    def remove(self, slot: int, task: Dict[str, Any]) -> None:
+        entry = self._entry(slot, task)
+        if entry is None:
+            return
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def due_between(self, start: float, end: float) -> List[int]:
+        """Slots of open tasks due on days start <= day < end, earliest first"""
+        low = bisect_left(self._entries, (start, -1))
+        high = bisect_left(self._entries, (end, -1))
+        return [slot for _, slot in self._entries[low:high]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used by the search index"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Distinct three-character substrings of already-lowercased text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+class TextIndex:
+    """Token and trigram inverted index over task descriptions and property names"""
+
+    def __init__(self) -> None:
+        self._tokens: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+        # slot -> lowercased "description\nproperty" used to verify substring hits
+        self._texts: Dict[int, str] = {}
+
+    @staticmethod
+    def _text(task: Dict[str, Any]) -> str:
+        return f"{task.get('task_description', '')}\n{task.get('property_name', '')}".lower()
+
+    def add(self, slot: int, task: Dict[str, Any]) -> None:
+        text = self._text(task)
+        self._texts[slot] = text
+        for token in set(tokenize(text)):
+            self._tokens.setdefault(token, set()).add(slot)
+        for gram in trigrams(text):
+            self._trigrams.setdefault(gram, set()).add(slot)
+
+    def remove(self, slot: int, task: Dict[str, Any]) -> None:
+        text = self._texts.pop(slot, None)
+        if text is None:
+            return
+        for postings, keys in ((self._tokens, set(tokenize(text))), (self._trigrams, trigrams(text))):
+            for key in keys:
+                slots = postings.get(key)
+                if slots is None:
+                    continue
+                slots.discard(slot)
+                if not slots:
+                    del postings[key]
+
+    def containing(self, fragment: str) -> Set[int]:
+        """Slots whose indexed text contains fragment (case-insensitive)"""
+        fragment = fragment.lower()
+        if len(fragment) < 3:
+            return {slot for slot, text in self._texts.items() if fragment in text}
+        postings = sorted(
+            (self._trigrams.get(gram, set()) for gram in trigrams(fragment)),
+            key=len
+        )
+        candidates = set(postings[0])
+        for slots in postings[1:]:
+            candidates.intersection_update(slots)
+            if not candidates:
+                return candidates
+        return {slot for slot in candidates if fragment in self._texts[slot]}
+
+    def search(self, query: str) -> List[Tuple[float, int]]:
+        """(score, slot) pairs ranked best first; whole-word hits outweigh partial ones"""
+        total = max(len(self._texts), 1)
+        scores: Dict[int, float] = {}
+        matched_terms: Dict[int, int] = {}
+        for term in set(tokenize(query)):
+            exact = self._tokens.get(term, set())
+            partial = self.containing(term) - exact if len(term) >= 3 else set()
+            document_frequency = len(exact) + len(partial)
+            if not document_frequency:
+                continue
+            weight = math.log(1 + total / document_frequency)
+            for slots, factor in ((exact, 1.0), (partial, 0.5)):
+                for slot in slots:
+                    scores[slot] = scores.get(slot, 0.0) + weight * factor
+                    matched_terms[slot] = matched_terms.get(slot, 0) + 1
+        ranked = sorted(scores, key=lambda slot: (-matched_terms[slot], -scores[slot], slot))
+        return [(round(scores[slot], 4), slot) for slot in ranked]
@@ -0,0 +1,163 @@
+import base64
+import json
+import math
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, List, Any, Optional, Tuple
+
+SORT_FIELDS = ('due_date', 'priority', 'estimated_cost')
+
+# Lower rank sorts first in ascending order
+PRIORITY_RANK = {
+    'emergency': 0,
+    'critical': 0,
+    'urgent': 0,
+    'high': 1,
+    'medium': 2,
+    'low': 3,
+}
+
+
+def due_ordinal(due_date: str) -> Optional[int]:
+    """Parse a YYYY-MM-DD due date into a day ordinal, None when missing or invalid"""
+    if not due_date:
+        return None
+    try:
+        return date.fromisoformat(due_date).toordinal()
+    except ValueError:
+        return None
+
+
+def is_overdue(task: Dict[str, Any], today_ordinal: int) -> bool:
+    """True for a task that is not completed and whose due date has passed"""
+    if str(task.get('status', '')).lower() == 'completed':
+        return False
+    due = due_ordinal(task.get('due_date', ''))
+    return due is not None and due < today_ordinal
+
+
+def filter_tasks(
+    tasks: List[Dict[str, Any]],
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    property_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Keep tasks matching every given filter (case-insensitive); status 'Overdue' is computed"""
+    checks: List[Tuple[str, str]] = []
+    overdue_only = False
+    if status:
+        if status.lower() == 'overdue':
+            overdue_only = True
+        else:
+            checks.append(('status', status.lower()))
+    if category:
+        checks.append(('category', category.lower()))
+    if priority:
+        checks.append(('priority', priority.lower()))
+    if property_name:
+        checks.append(('property_name', property_name.lower()))
+
+    if not checks and not overdue_only:
+        return list(tasks)
+
+    today_ordinal = date.today().toordinal()
+    return [
+        task for task in tasks
+        if all(str(task.get(field, '')).lower() == value for field, value in checks)
+        and (not overdue_only or is_overdue(task, today_ordinal))
+    ]
+
+
+def _sort_key(task: Dict[str, Any], sort_by: Optional[str], descending: bool) -> Tuple:
+    """Build a JSON-friendly key; missing values sort last and (row number, ID) breaks ties.
+
+    The row number keeps ties, and unsorted pages, in sheet order; the ID keeps keys
+    unique even for rows that do not have one yet.
+    """
+    tiebreak = (int(task.get('row_number') or 0), str(task.get('id') or ''))
+    if sort_by is None:
+        return (0, 0) + tiebreak
+
+    if sort_by == 'due_date':
+        value = due_ordinal(task.get('due_date', ''))
+    elif sort_by == 'priority':
+        value = PRIORITY_RANK.get(str(task.get('priority', '')).lower())
+    else:
+        try:
+            value = float(task.get('estimated_cost') or 0)
+        except (TypeError, ValueError):
+            value = None
+        # inf/nan would not compare or survive the JSON cursor; sort them with the blanks
+        if value is not None and not math.isfinite(value):
+            value = None
+
+    if value is None:
+        return (1, 0) + tiebreak
+    return (0, -value if descending else value) + tiebreak
+
+
+def encode_cursor(sort_by: Optional[str], descending: bool, key: Tuple) -> str:
+    """Opaque cursor pointing just past the given sort key"""
+    payload = json.dumps([sort_by, descending, list(key)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort_by: Optional[str], descending: bool) -> Tuple:
+    """Recover the sort key from a cursor; raises ValueError if it does not fit this query"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, cursor_desc, key = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort_by or cursor_desc != descending:
+        raise ValueError("Cursor does not match the requested sort order")
+    # Cursors from before (row number, ID) broke ties have a different shape and no longer compare
+    if (
+        not isinstance(key, list) or len(key) != 4
+        or not isinstance(key[2], int) or not isinstance(key[3], str)
+    ):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+
+def query_tasks(
+    tasks: List[Dict[str, Any]],
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    property_name: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """Filter, sort and page a task list with keyset cursors that survive inserts and deletes"""
+    if sort_by is not None and sort_by not in SORT_FIELDS:
+        raise ValueError(f"sort_by must be one of: {', '.join(SORT_FIELDS)}")
+
+    matching = filter_tasks(tasks, status, category, priority, property_name)
+    if sort_by is None and limit is None and not cursor:
+        # One unsorted page is the sheet order the key below would give; skip the sort
+        return {"tasks": matching, "total": len(matching), "next_cursor": None}
+    keyed = sorted(
+        ((_sort_key(task, sort_by, descending), task) for task in matching),
+        key=lambda item: item[0]
+    )
+
+    start = 0
+    if cursor:
+        after = decode_cursor(cursor, sort_by, descending)
+        start = bisect_right(keyed, after, key=lambda item: item[0])
+
+    end = len(keyed) if limit is None else start + limit
+    page = keyed[start:end]
+    next_cursor = None
+    if page and end < len(keyed):
+        next_cursor = encode_cursor(sort_by, descending, page[-1][0])
+
+    return {
+        "tasks": [task for _, task in page],
+        "total": len(keyed),
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,144 @@
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Canonical task fields, in response order
+TASK_FIELDS = (
+    'id', 'row_number', 'property_name', 'task_description', 'category', 'priority',
+    'status', 'due_date', 'completed_date', 'created_date', 'estimated_cost',
+    'emergency_cost', 'notes', 'reporter_email',
+)
+_FIELD_SET = frozenset(TASK_FIELDS)
+
+# Old duplicate keys -> the field they copy; only sent when a client asks for them
+LEGACY_ALIASES = {
+    'property_address': 'property_name',
+    'task_name': 'task_description',
+    'description': 'notes',
+}
+
+# Low-cardinality text shared by many tasks; interned so each distinct value is stored once
+INTERNED_FIELDS = frozenset({
+    'property_name', 'category', 'priority', 'status', 'due_date', 'completed_date', 'created_date',
+})
+
+
+def _stored(field: str, value: Any) -> Any:
+    if field in INTERNED_FIELDS and type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+class TaskRecord(Mapping):
+    """One cached task: fixed slots instead of a per-task dict, read like a dict"""
+
+    __slots__ = TASK_FIELDS
+
+    def __init__(self, **fields: Any) -> None:
+        for field in TASK_FIELDS:
+            setattr(self, field, _stored(field, fields.get(field, '')))
+
+    @classmethod
+    def from_mapping(cls, task: Mapping) -> "TaskRecord":
+        return cls(**{field: task[field] for field in TASK_FIELDS if field in task})
+
+    @classmethod
+    def from_row(cls, task_id: str, row_number: int, values: Sequence[Any]) -> "TaskRecord":
+        """From the values of every field after id and row_number, in TASK_FIELDS order.
+
+        Values are stored as given (already interned); used when loading whole sheets.
+        """
+        record = cls.__new__(cls)
+        record.id = task_id
+        record.row_number = row_number
+        (
+            record.property_name, record.task_description, record.category, record.priority,
+            record.status, record.due_date, record.completed_date, record.created_date,
+            record.estimated_cost, record.emergency_cost, record.notes, record.reporter_email,
+        ) = values
+        return record
+
+    def __getitem__(self, field: str) -> Any:
+        if field not in _FIELD_SET:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field: str, value: Any) -> None:
+        field = LEGACY_ALIASES.get(field, field)
+        if field not in _FIELD_SET:
+            raise KeyError(field)
+        setattr(self, field, _stored(field, value))
+
+    def get(self, field: str, default: Any = None) -> Any:
+        # Called for every task in every filter and index update, so skip Mapping's try/except
+        return getattr(self, field) if field in _FIELD_SET else default
+
+    def __contains__(self, field: object) -> bool:
+        return field in _FIELD_SET
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(TASK_FIELDS)
+
+    def __len__(self) -> int:
+        return len(TASK_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"TaskRecord({self.to_dict()!r})"
+
+    def update(self, changes: Mapping) -> None:
+        for field, value in changes.items():
+            self[field] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Spelled out: snapshots copy every cached task, and this is twice as fast as a loop
+        return {
+            'id': self.id,
+            'row_number': self.row_number,
+            'property_name': self.property_name,
+            'task_description': self.task_description,
+            'category': self.category,
+            'priority': self.priority,
+            'status': self.status,
+            'due_date': self.due_date,
+            'completed_date': self.completed_date,
+            'created_date': self.created_date,
+            'estimated_cost': self.estimated_cost,
+            'emergency_cost': self.emergency_cost,
+            'notes': self.notes,
+            'reporter_email': self.reporter_email,
+        }
+
+
+class Projection:
+    """The task fields a response carries, from a fields= list and the legacy flag"""
+
+    def __init__(self, fields: Optional[Sequence[str]] = None, legacy: bool = False) -> None:
+        names = list(fields) if fields else list(TASK_FIELDS)
+        if legacy:
+            names += [alias for alias, field in LEGACY_ALIASES.items() if alias not in names and field in names]
+        self.names = names
+        # Tasks already come out of the tracker as canonical dicts, so the default costs nothing
+        self.is_default = not fields and not legacy
+        self._sources = [(name, LEGACY_ALIASES.get(name, name)) for name in names]
+
+    @classmethod
+    def parse(cls, fields: Optional[str], legacy: bool = False) -> "Projection":
+        """From 'id,status'-style query text; raises ValueError on unknown field names"""
+        names = [name.strip() for name in (fields or '').split(',') if name.strip()]
+        unknown = [name for name in names if name not in _FIELD_SET and name not in LEGACY_ALIASES]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Valid fields: {', '.join(TASK_FIELDS)}")
+        return cls(names, legacy)
+
+    def __call__(self, task: Mapping) -> Dict[str, Any]:
+        return {name: task.get(source, '') for name, source in self._sources}
+
+    def columns(self, tasks: Iterable[Mapping]) -> Dict[str, List[Any]]:
+        """One array per field instead of one object per task; field names are sent once"""
+        tasks = list(tasks)
+        return {name: [task.get(source, '') for task in tasks] for name, source in self._sources}
+
+    def apply(self, tasks: Iterable[Mapping]) -> List[Dict[str, Any]]:
+        if self.is_default:
+            return list(tasks)
+        return [self(task) for task in tasks]
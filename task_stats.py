@@ -0,0 +1,86 @@
+import math
+from collections import Counter
+from datetime import date
+from typing import Dict, Any, Optional
+from task_query import due_ordinal
+
+# Emergency repairs are assumed to cost this multiple of the preventive work
+EMERGENCY_COST_MULTIPLIER = 6.0
+
+
+class TaskStats:
+    """Dashboard counters and sums kept current as tasks are added and removed"""
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.pending = 0
+        self.completed = 0
+        # Costs are kept in integer cents so repeated add/remove cannot drift
+        self._completed_cost_cents = 0
+        # due-date ordinal -> number of open tasks due that day
+        self._open_due_days: Counter = Counter()
+        self._overdue = 0
+        self._overdue_day: Optional[int] = None
+
+    def add(self, task: Dict[str, Any]) -> None:
+        """Count a task"""
+        self._apply(task, 1)
+
+    def remove(self, task: Dict[str, Any]) -> None:
+        """Stop counting a task"""
+        self._apply(task, -1)
+
+    def overdue(self, today: Optional[int] = None) -> int:
+        """Open tasks due before today, recounted when the day rolls over"""
+        today = today if today is not None else date.today().toordinal()
+        if today != self._overdue_day:
+            self._overdue = sum(
+                count for day, count in self._open_due_days.items() if day < today
+            )
+            self._overdue_day = today
+        return self._overdue
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Stats in the /api/stats response format"""
+        preventive_cost = self._completed_cost_cents / 100
+        emergency_cost_averted = preventive_cost * EMERGENCY_COST_MULTIPLIER
+        net_savings = emergency_cost_averted - preventive_cost
+
+        return {
+            "total_tasks": self.total,
+            "pending": self.pending,
+            "overdue": self.overdue(),
+            "completed": self.completed,
+            "preventive_cost": round(preventive_cost, 2),
+            "emergency_cost_averted": round(emergency_cost_averted, 2),
+            "net_savings": round(net_savings, 2)
+        }
+
+    def _apply(self, task: Dict[str, Any], sign: int) -> None:
+        status = str(task.get('status', '')).lower()
+        self.total += sign
+
+        if status == 'pending':
+            self.pending += sign
+        if status == 'completed':
+            self.completed += sign
+            self._completed_cost_cents += sign * _cost_cents(task.get('estimated_cost'))
+            return
+
+        due = due_ordinal(task.get('due_date', ''))
+        if due is None:
+            return
+        self._open_due_days[due] += sign
+        if self._open_due_days[due] <= 0:
+            del self._open_due_days[due]
+        if self._overdue_day is not None and due < self._overdue_day:
+            self._overdue += sign
+
+
+def _cost_cents(value: Any) -> int:
+    """Cost in whole cents; blank, unparseable, inf and nan cells count as 0"""
+    try:
+        cost = float(value or 0)
+    except (TypeError, ValueError):
+        return 0
+    return round(cost * 100) if math.isfinite(cost) else 0
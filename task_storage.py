@@ -0,0 +1,465 @@
+import gspread
+from google.oauth2.service_account import Credentials
+import os
+import sqlite3
+import threading
+import uuid
+import logging
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, List, Any, Optional, Tuple
+
+import metrics
+from sheets_scheduler import SheetsScheduler, Priority, call_priority, default_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Sheet column holding each task's permanent ID
+TASK_ID_HEADER = 'Task ID'
+
+
+def new_task_id() -> str:
+    """Generate a permanent task ID that never changes when rows move.
+
+    All-digit suffixes are skipped, since task_<number> is a legacy row-number ID.
+    """
+    while True:
+        suffix = uuid.uuid4().hex[:12]
+        if not suffix.isdigit():
+            return f"task_{suffix}"
+
+
+# Columns written by the app - matches PMT-Project spreadsheet column order
+SHEET_COLUMNS = {
+    'Property Address': 1,
+    'Task Description': 2,
+    'Category': 3,
+    'Priority': 4,
+    'Status': 5,
+    'Due Date': 6,
+    'Completed Date': 7,
+    'Estimated Cost': 8,
+    'Emergency Cost': 9,
+    'Notes': 10,
+    'Reporter Email': 11,
+}
+
+
+class TaskStorage(ABC):
+    """Where task rows live. Records are keyed by the spreadsheet headers and
+    addressed by their 1-based sheet row (row 1 is the header row)."""
+
+    name = "storage"
+
+    @abstractmethod
+    def fetch_records(self) -> List[Dict[str, Any]]:
+        """All task records in row order"""
+
+    @abstractmethod
+    def append_records(self, records: List[Dict[str, Any]]) -> int:
+        """Append records after the last row; returns the row of the first one"""
+
+    @abstractmethod
+    def update_fields(self, row_number: int, task_id: Optional[str], fields: Dict[str, Any]) -> None:
+        """Overwrite some fields of one record"""
+
+    @abstractmethod
+    def delete_record(self, row_number: int, task_id: Optional[str]) -> None:
+        """Remove one record; later rows move up by one"""
+
+    @abstractmethod
+    def assign_task_ids(self, assignments: List[Tuple[int, str]]) -> None:
+        """Store generated IDs for (row_number, task_id) records that had none"""
+
+    def update_many(self, updates: List[Tuple[int, Optional[str], Dict[str, Any]]]) -> None:
+        """Apply several (row_number, task_id, fields) updates; backends batch them where they can"""
+        for row_number, task_id, fields in updates:
+            self.update_fields(row_number, task_id, fields)
+
+    def reserve_write(self) -> ContextManager[None]:
+        """Wait for quota for one write up front, before the caller takes its locks"""
+        return nullcontext()
+
+    def add_rows_changed_listener(self, listener: Callable[[], None]) -> None:
+        """Call listener() when rows moved in ways the caller's row numbers do not reflect"""
+        return None
+
+    def close(self) -> None:
+        """Finish background work and release connections"""
+        return None
+
+
+class GoogleSheetsStorage(TaskStorage):
+    """Task rows in a Google Sheets worksheet"""
+
+    name = "sheets"
+
+    def __init__(self, worksheet: Any, scheduler: Optional[SheetsScheduler] = None) -> None:
+        self.worksheet = worksheet
+        self.scheduler = scheduler or default_scheduler()
+        self.id_column = self._ensure_id_column()
+
+    @classmethod
+    def from_credentials(cls, credentials_file: str, spreadsheet_name: str) -> "GoogleSheetsStorage":
+        """Open the tasks worksheet with a service account credentials file"""
+        if not os.path.exists(credentials_file):
+            raise FileNotFoundError(
+                f"Credentials file not found: {credentials_file}\n"
+                "Please ensure you have:\n"
+                "1. Created a Google Cloud Service Account\n"
+                "2. Downloaded the JSON credentials file\n"
+                "3. Placed it at the specified path\n"
+                "4. Enabled Google Sheets and Google Drive APIs"
+            )
+
+        # Use google-auth instead of deprecated oauth2client
+        scope = [
+            'https://spreadsheets.google.com/feeds',
+            'https://www.googleapis.com/auth/drive'
+        ]
+
+        try:
+            credentials = Credentials.from_service_account_file(
+                credentials_file,
+                scopes=scope
+            )
+            gc = gspread.authorize(credentials)
+            return cls.from_client(gc, spreadsheet_name)
+
+        except gspread.SpreadsheetNotFound:
+            raise ValueError(
+                f"Spreadsheet '{spreadsheet_name}' not found.\n"
+                f"Make sure:\n"
+                f"1. The spreadsheet exists\n"
+                f"2. It's named exactly 'PMT-Project'\n"
+                f"3. You've shared it with your service account email"
+            )
+        except Exception as e:
+            raise Exception(f"Failed to initialize tracker: {e}")
+
+    @classmethod
+    def from_client(
+        cls,
+        client: Any,
+        spreadsheet_name: str,
+        scheduler: Optional[SheetsScheduler] = None
+    ) -> "GoogleSheetsStorage":
+        """Open the tasks worksheet through an authorized gspread (or fake) client"""
+        # Open the spreadsheet by name (PMT-Project)
+        spreadsheet = client.open(spreadsheet_name)
+        logger.info(f"Successfully opened spreadsheet: {spreadsheet_name}")
+
+        # Try to get "Maintenance Tasks" worksheet, fall back to first sheet
+        try:
+            worksheet = spreadsheet.worksheet("Maintenance Tasks")
+            logger.info("Using 'Maintenance Tasks' worksheet")
+        except gspread.WorksheetNotFound:
+            worksheet = spreadsheet.sheet1
+            logger.warning("'Maintenance Tasks' worksheet not found, using first sheet")
+
+        return cls(worksheet, scheduler)
+
+    def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Invoke a worksheet API method through the quota scheduler, recording each attempt for /metrics"""
+        api_method = getattr(self.worksheet, method)
+
+        def attempt() -> Any:
+            start = time.perf_counter()
+            try:
+                return api_method(*args, **kwargs)
+            finally:
+                metrics.record_sheets_call(method, time.perf_counter() - start)
+        return self.scheduler.run(method, attempt)
+
+    def _ensure_id_column(self) -> int:
+        """Find the Task ID column, adding its header after the existing ones if missing"""
+        headers = self._call('row_values', 1)
+        if TASK_ID_HEADER in headers:
+            return headers.index(TASK_ID_HEADER) + 1
+
+        id_column = max(len(headers), len(SHEET_COLUMNS)) + 1
+        self._call('update_cell', 1, id_column, TASK_ID_HEADER)
+        logger.info(f"Added '{TASK_ID_HEADER}' column at column {id_column}")
+        return id_column
+
+    def _column(self, header: str) -> int:
+        return self.id_column if header == TASK_ID_HEADER else SHEET_COLUMNS[header]
+
+    def _row_values(self, record: Dict[str, Any]) -> List[Any]:
+        row = [""] * self.id_column
+        for header, value in record.items():
+            if header == TASK_ID_HEADER or header in SHEET_COLUMNS:
+                row[self._column(header) - 1] = value
+        return row
+
+    def reserve_write(self) -> ContextManager[None]:
+        return self.scheduler.reserve('write')
+
+    def fetch_records(self) -> List[Dict[str, Any]]:
+        records = self._call('get_all_records')
+        metrics.record_rows_fetched(len(records))
+        return records
+
+    def append_records(self, records: List[Dict[str, Any]]) -> int:
+        response = self._call(
+            'append_rows',
+            [self._row_values(record) for record in records],
+            value_input_option='USER_ENTERED',
+            insert_data_option='INSERT_ROWS',
+            table_range='A1'
+        )
+        # e.g. "'Maintenance Tasks'!A12:K12" - the sheet picks the row atomically
+        updated_range = response['updates']['updatedRange']
+        first_cell = updated_range.split('!')[-1].split(':')[0]
+        return int(''.join(ch for ch in first_cell if ch.isdigit()))
+
+    def update_fields(self, row_number: int, task_id: Optional[str], fields: Dict[str, Any]) -> None:
+        if len(fields) == 1:
+            header, value = next(iter(fields.items()))
+            self._call('update_cell', row_number, self._column(header), value)
+            return
+        self._call(
+            'batch_update',
+            [
+                {
+                    'range': gspread.utils.rowcol_to_a1(row_number, self._column(header)),
+                    'values': [[value]],
+                }
+                for header, value in fields.items()
+            ],
+            value_input_option='USER_ENTERED'
+        )
+
+    def update_many(self, updates: List[Tuple[int, Optional[str], Dict[str, Any]]]) -> None:
+        # One batch_update round-trip for every cell, instead of one call per task
+        self._call(
+            'batch_update',
+            [
+                {
+                    'range': gspread.utils.rowcol_to_a1(row_number, self._column(header)),
+                    'values': [[value]],
+                }
+                for row_number, _, fields in updates
+                for header, value in fields.items()
+            ],
+            value_input_option='USER_ENTERED'
+        )
+
+    def delete_record(self, row_number: int, task_id: Optional[str]) -> None:
+        self._call('delete_rows', row_number)
+
+    def assign_task_ids(self, assignments: List[Tuple[int, str]]) -> None:
+        self._call(
+            'batch_update',
+            [
+                {
+                    'range': gspread.utils.rowcol_to_a1(row_number, self.id_column),
+                    'values': [[task_id]],
+                }
+                for row_number, task_id in assignments
+            ],
+            value_input_option='RAW'
+        )
+
+
+# Spreadsheet header -> SQLite column
+SQLITE_COLUMNS = {
+    'Property Address': 'property_address',
+    'Task Description': 'task_description',
+    'Category': 'category',
+    'Priority': 'priority',
+    'Status': 'status',
+    'Due Date': 'due_date',
+    'Completed Date': 'completed_date',
+    'Estimated Cost': 'estimated_cost',
+    'Emergency Cost': 'emergency_cost',
+    'Notes': 'notes',
+    'Reporter Email': 'reporter_email',
+    'Date Created': 'date_created',
+    TASK_ID_HEADER: 'task_id',
+}
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    position INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL UNIQUE,
+    property_address TEXT NOT NULL DEFAULT '',
+    task_description TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    due_date TEXT NOT NULL DEFAULT '',
+    completed_date TEXT NOT NULL DEFAULT '',
+    estimated_cost TEXT NOT NULL DEFAULT '',
+    emergency_cost TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    reporter_email TEXT NOT NULL DEFAULT '',
+    date_created TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_property ON tasks (property_address COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks (category COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date);
+"""
+
+_SELECT_ALL = (
+    "SELECT " + ", ".join(SQLITE_COLUMNS.values()) + " FROM tasks ORDER BY position"
+)
+_INSERT = (
+    "INSERT INTO tasks (" + ", ".join(SQLITE_COLUMNS.values()) + ") VALUES ("
+    + ", ".join("?" for _ in SQLITE_COLUMNS) + ")"
+)
+_POSITION_FOR_ROW = "SELECT position FROM tasks ORDER BY position LIMIT 1 OFFSET ?"
+
+
+class SQLiteStorage(TaskStorage):
+    """Task rows in a local SQLite database (WAL mode, one connection per thread)"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.executescript(_SQLITE_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # sqlite3 caches the prepared form of each constant statement per connection
+            connection = sqlite3.connect(self.path, timeout=30, cached_statements=256)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _stored(value: Any) -> str:
+        # Sheets drops the leading apostrophe used to force text; do the same here
+        return str(value).lstrip("'") if value is not None else ''
+
+    def _position(self, connection: sqlite3.Connection, row_number: int, task_id: Optional[str]) -> int:
+        """Position of the task with this ID; the row number is only used for calls without an ID.
+
+        Raises KeyError when nothing matches: a missing ID means the task is already gone,
+        and whatever row took its place must not be touched instead.
+        """
+        if task_id:
+            found = connection.execute(
+                "SELECT position FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            if not found:
+                raise KeyError(f"No task with ID {task_id}")
+            return found[0]
+        found = connection.execute(_POSITION_FOR_ROW, (row_number - 2,)).fetchone()
+        if not found:
+            raise KeyError(f"No task at row {row_number}")
+        return found[0]
+
+    def fetch_records(self) -> List[Dict[str, Any]]:
+        headers = list(SQLITE_COLUMNS)
+        rows = self._connection().execute(_SELECT_ALL).fetchall()
+        return [dict(zip(headers, row)) for row in rows]
+
+    def append_records(self, records: List[Dict[str, Any]]) -> int:
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            first_row = connection.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] + 2
+            connection.executemany(_INSERT, [
+                tuple(self._stored(record.get(header, '')) for header in SQLITE_COLUMNS)
+                for record in records
+            ])
+        return first_row
+
+    def update_fields(self, row_number: int, task_id: Optional[str], fields: Dict[str, Any]) -> None:
+        columns = [SQLITE_COLUMNS[header] for header in fields]
+        connection = self._connection()
+        with connection:
+            position = self._position(connection, row_number, task_id)
+            connection.execute(
+                "UPDATE tasks SET " + ", ".join(f"{column} = ?" for column in columns)
+                + " WHERE position = ?",
+                [self._stored(value) for value in fields.values()] + [position]
+            )
+
+    def delete_record(self, row_number: int, task_id: Optional[str]) -> None:
+        connection = self._connection()
+        with connection:
+            position = self._position(connection, row_number, task_id)
+            connection.execute("DELETE FROM tasks WHERE position = ?", (position,))
+
+    def assign_task_ids(self, assignments: List[Tuple[int, str]]) -> None:
+        # Every SQLite row is created with an ID, so there is never anything to backfill
+        return None
+
+
+class MirroredStorage(TaskStorage):
+    """Serve from a fast primary store and replay every write to a mirror in the
+    background, e.g. SQLite for the app with Google Sheets kept for owners to view."""
+
+    def __init__(self, primary: TaskStorage, mirror: TaskStorage) -> None:
+        self.primary = primary
+        self.mirror = mirror
+        self.name = f"{primary.name}+{mirror.name}"
+        # One worker keeps mirror writes in the same order as the primary's
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-mirror")
+        if not primary.fetch_records():
+            self._seed_from_mirror()
+
+    def _seed_from_mirror(self) -> None:
+        with call_priority(Priority.BULK):
+            records = self.mirror.fetch_records()
+        if not records:
+            return
+        missing = []
+        for row_number, record in enumerate(records, start=2):
+            if not record.get(TASK_ID_HEADER):
+                record[TASK_ID_HEADER] = new_task_id()
+                missing.append((row_number, record[TASK_ID_HEADER]))
+        self.primary.append_records(records)
+        if missing:
+            with call_priority(Priority.BULK):
+                self.mirror.assign_task_ids(missing)
+        logger.info(f"Seeded {self.primary.name} storage with {len(records)} tasks from {self.mirror.name}")
+
+    def _replay(self, method: str, *args: Any) -> None:
+        def run() -> None:
+            try:
+                with call_priority(Priority.BACKGROUND):
+                    getattr(self.mirror, method)(*args)
+            except Exception as e:
+                logger.error(f"Mirror {method} to {self.mirror.name} failed: {e}")
+        self._executor.submit(run)
+
+    def fetch_records(self) -> List[Dict[str, Any]]:
+        return self.primary.fetch_records()
+
+    def reserve_write(self) -> ContextManager[None]:
+        # Mirror writes run in the background, so only the primary's quota holds up a caller
+        return self.primary.reserve_write()
+
+    def append_records(self, records: List[Dict[str, Any]]) -> int:
+        first_row = self.primary.append_records(records)
+        self._replay('append_records', records)
+        return first_row
+
+    def update_fields(self, row_number: int, task_id: Optional[str], fields: Dict[str, Any]) -> None:
+        self.primary.update_fields(row_number, task_id, fields)
+        self._replay('update_fields', row_number, task_id, fields)
+
+    def delete_record(self, row_number: int, task_id: Optional[str]) -> None:
+        self.primary.delete_record(row_number, task_id)
+        self._replay('delete_record', row_number, task_id)
+
+    def assign_task_ids(self, assignments: List[Tuple[int, str]]) -> None:
+        self.primary.assign_task_ids(assignments)
+        self._replay('assign_task_ids', assignments)
+
+    def close(self) -> None:
+        # Let queued mirror writes finish before the process exits
+        self._executor.shutdown(wait=True)
+        self.primary.close()
+        self.mirror.close()
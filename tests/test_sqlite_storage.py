@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from management_tracker import PropertyManagementTracker
+from task_storage import SQLiteStorage
+
+
+def _trackers(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    first = PropertyManagementTracker(storage=SQLiteStorage(path))
+    second = PropertyManagementTracker(storage=SQLiteStorage(path))
+    first.add_maintenance_tasks([
+        {"property_name": "A", "task_description": "one", "due_date": "2026-01-01"},
+        {"property_name": "A", "task_description": "two", "due_date": "2026-01-02"},
+    ])
+    return first, second
+
+
+def _descriptions(tracker):
+    tracker._cache.invalidate()
+    return [task["task_description"] for task in tracker.get_all_tasks()]
+
+
+def test_second_delete_by_id_leaves_the_next_task(tmp_path):
+    first, second = _trackers(tmp_path)
+    task_id = first.get_all_tasks()[0]["id"]
+    second.get_all_tasks()  # caches "one" at row 2
+
+    assert first.delete_task_by_id(task_id)["success"]
+    assert not second.delete_task_by_id(task_id)["success"]
+    assert _descriptions(first) == ["two"]
+
+
+def test_update_by_id_after_delete_leaves_the_next_task(tmp_path):
+    first, second = _trackers(tmp_path)
+    task_id = first.get_all_tasks()[0]["id"]
+    second.get_all_tasks()
+
+    assert first.delete_task_by_id(task_id)["success"]
+    assert not second.update_task_status_by_id(task_id, "Completed")["success"]
+    first._cache.invalidate()
+    assert [task["status"] for task in first.get_all_tasks()] == ["Pending"]
@@ -0,0 +1,364 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from sheets_scheduler import Priority, QuotaExhausted, call_priority
+from task_storage import TaskStorage, TASK_ID_HEADER
+
+logger = logging.getLogger(__name__)
+
+# Failed flushes of one queued write before it is moved to the dead-letter file
+DEFAULT_MAX_ATTEMPTS = 20
+
+
+class WriteBehindStorage(TaskStorage):
+    """Acknowledge writes once they are in a local fsync'd journal, and flush them to the
+    wrapped storage in coalesced batches from a background thread.
+
+    Every queued mutation is one JSON line in the journal; the file is rewritten with
+    whatever is still pending after each flush and replayed on startup, so a crash or
+    restart never loses an acknowledged write.
+    """
+
+    def __init__(
+        self,
+        primary: TaskStorage,
+        journal_path: str,
+        max_delay: float = 2.0,
+        max_batch: int = 200,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ) -> None:
+        """max_delay is the longest a write waits before a flush starts, in seconds.
+
+        A write the primary rejects max_attempts times is appended to <journal>.dead and
+        dropped, so it cannot hold back everything queued behind it.
+        """
+        self.primary = primary
+        self.name = f"{primary.name}+write-behind"
+        self.journal_path = journal_path
+        self.dead_letter_path = journal_path + '.dead'
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self._queue: List[Dict[str, Any]] = []
+        self._condition = threading.Condition()
+        # Held across a flush, and across fetch+overlay so no flush lands in between
+        self._flush_lock = threading.RLock()
+        self._closed = False
+        # Data rows the primary will hold once the queue is flushed; None until first fetch
+        self._row_count: Optional[int] = None
+        # Set when queued row numbers may no longer match the sheet (restart, foreign appends);
+        # every flush then re-resolves rows by task ID until a fetch realigns the caller's rows
+        self._rows_stale = False
+        self._rows_changed_listeners: List[Callable[[], None]] = []
+
+        self._queue = self._read_journal()
+        if self._queue:
+            logger.info(f"Replaying {len(self._queue)} journaled writes to {primary.name} storage")
+            self._rows_stale = True
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name="storage-write-behind", daemon=True)
+        self._thread.start()
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.journal_path):
+            return []
+        entries = []
+        with open(self.journal_path, encoding='utf-8') as journal:
+            for line_number, line in enumerate(journal, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Only the last line can be torn, by a crash mid-write; it was never acknowledged
+                    logger.warning(f"Ignoring unreadable journal line {line_number} in {self.journal_path}")
+        return entries
+
+    def _enqueue(self, *entries: Dict[str, Any]) -> None:
+        """Journal and queue writes with a single fsync; safe to call with the condition already held"""
+        now = time.time()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Write-behind storage is closed")
+            for entry in entries:
+                entry['at'] = now
+                self._journal.write(json.dumps(entry) + '\n')
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._queue.extend(entries)
+            self._condition.notify()
+
+    def _rewrite_journal(self) -> None:
+        """Replace the journal with the entries still queued (caller holds the condition)"""
+        temp_path = self.journal_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as journal:
+            for entry in self._queue:
+                journal.write(json.dumps(entry) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        self._journal.close()
+        os.replace(temp_path, self.journal_path)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def _run(self) -> None:
+        """Flush once the oldest write has waited max_delay or a full batch is queued"""
+        backoff = self.max_delay
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._queue:
+                        wait = self._queue[0]['at'] + self.max_delay - time.time()
+                        if wait <= 0 or len(self._queue) >= self.max_batch:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+            try:
+                with call_priority(Priority.BACKGROUND):
+                    self.flush()
+                backoff = self.max_delay
+            except Exception as e:
+                logger.warning(f"Write-behind flush to {self.primary.name} failed, retrying in {backoff:.1f}s: {e}")
+                with self._condition:
+                    self._condition.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def flush(self) -> None:
+        """Write everything queued so far to the primary storage, oldest first"""
+        with self._flush_lock:
+            with self._condition:
+                batch = list(self._queue)
+            if not batch:
+                return
+
+            done = 0
+            try:
+                if self._rows_stale:
+                    self._resolve_rows(batch)
+                for start, end in self._runs(batch):
+                    try:
+                        self._apply(batch[start:end], batch[end:])
+                    except QuotaExhausted:
+                        # Throttled, not rejected: wait without spending attempts
+                        raise
+                    except Exception as e:
+                        if not self._give_up(batch[start:end], e):
+                            raise
+                    done = end
+            finally:
+                if done:
+                    with self._condition:
+                        del self._queue[:done]
+                        self._rewrite_journal()
+
+    def _give_up(self, run: List[Dict[str, Any]], error: Exception) -> bool:
+        """Count a failed attempt at a run; once it has failed max_attempts times, move it to
+        the dead-letter file and report it dropped"""
+        for entry in run:
+            entry['attempts'] = entry.get('attempts', 0) + 1
+        if run[0]['attempts'] < self.max_attempts:
+            return False
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as dead_letters:
+            for entry in run:
+                dead_letters.write(json.dumps({**entry, 'error': str(error)}) + '\n')
+            dead_letters.flush()
+            os.fsync(dead_letters.fileno())
+        logger.error(
+            f"Dropped {len(run)} queued {run[0]['op']} write(s) after {run[0]['attempts']} failed attempts, "
+            f"saved to {self.dead_letter_path}: {error}"
+        )
+        return True
+
+    @staticmethod
+    def _runs(batch: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+        """Split the batch into runs of consecutive same-kind operations"""
+        runs = []
+        start = 0
+        for index in range(1, len(batch) + 1):
+            if (
+                index == len(batch)
+                or batch[index]['op'] != batch[start]['op']
+                or batch[index]['op'] == 'delete'
+            ):
+                runs.append((start, index))
+                start = index
+        return runs
+
+    def _apply(self, run: List[Dict[str, Any]], later: List[Dict[str, Any]]) -> None:
+        """Send one run of operations as a single storage call"""
+        op = run[0]['op']
+        if op == 'append':
+            records = [entry['record'] for entry in run if not entry.get('skip')]
+            # Status changes queued behind a still-unsent task are written with it
+            for entry in later:
+                if entry['op'] == 'update' and not entry.get('skip'):
+                    for record in records:
+                        if entry['task_id'] and record.get(TASK_ID_HEADER) == entry['task_id']:
+                            record.update(entry['fields'])
+                            entry['skip'] = True
+            if records:
+                first_row = self.primary.append_records(records)
+                expected = next((entry['row'] for entry in run if not entry.get('skip')), first_row)
+                if first_row != expected:
+                    logger.warning(
+                        f"Sheet placed queued tasks at row {first_row}, expected {expected}; "
+                        "re-resolving queued rows by task ID"
+                    )
+                    # Writes queued from now on still use the caller's old row numbers
+                    self._rows_stale = True
+                    self._resolve_rows(later)
+                    for listener in list(self._rows_changed_listeners):
+                        listener()
+        elif op == 'update':
+            # Later changes to the same task overwrite earlier ones
+            merged: Dict[Any, Tuple[int, Optional[str], Dict[str, Any]]] = {}
+            for entry in run:
+                if entry.get('skip'):
+                    continue
+                key = entry['task_id'] or entry['row']
+                fields = merged[key][2] if key in merged else {}
+                fields.update(entry['fields'])
+                merged[key] = (entry['row'], entry['task_id'], fields)
+            if merged:
+                self.primary.update_many(list(merged.values()))
+        elif op == 'delete':
+            for entry in run:
+                if not entry.get('skip'):
+                    self.primary.delete_record(entry['row'], entry['task_id'])
+
+    def _resolve_rows(self, entries: List[Dict[str, Any]]) -> None:
+        """Recompute queued row numbers from task IDs against the primary's current rows"""
+        records = self.primary.fetch_records()
+        rows = {
+            record.get(TASK_ID_HEADER): row_number
+            for row_number, record in enumerate(records, start=2)
+            if record.get(TASK_ID_HEADER)
+        }
+        last_row = len(records) + 1
+
+        for entry in entries:
+            if entry['op'] == 'append':
+                task_id = entry['record'].get(TASK_ID_HEADER)
+                if task_id in rows:
+                    # Written before a restart cut the journal truncation short
+                    entry['skip'] = True
+                    continue
+                last_row += 1
+                entry['row'] = last_row
+                if task_id:
+                    rows[task_id] = last_row
+                continue
+
+            task_id = entry.get('task_id')
+            if not task_id:
+                continue
+            if task_id not in rows:
+                logger.warning(f"Dropping queued {entry['op']} for task {task_id}: it is no longer in the sheet")
+                entry['skip'] = True
+                continue
+            entry['row'] = rows[task_id]
+            if entry['op'] == 'delete':
+                deleted_row = rows.pop(task_id)
+                last_row -= 1
+                for other_id, row_number in rows.items():
+                    if row_number > deleted_row:
+                        rows[other_id] = row_number - 1
+
+    def _overlay(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply still-queued writes to freshly fetched records (caller holds the condition)"""
+        for entry in self._queue:
+            if entry.get('skip'):
+                continue
+            if entry['op'] == 'append':
+                records.append(dict(entry['record']))
+                continue
+            position = entry['row'] - 2
+            if entry['task_id']:
+                position = next(
+                    (index for index, record in enumerate(records)
+                     if record.get(TASK_ID_HEADER) == entry['task_id']),
+                    None
+                )
+            if position is None or not 0 <= position < len(records):
+                continue
+            if entry['op'] == 'delete':
+                del records[position]
+            else:
+                # The sheet drops the leading apostrophe of USER_ENTERED text
+                records[position].update({
+                    header: value[1:] if isinstance(value, str) and value.startswith("'") else value
+                    for header, value in entry['fields'].items()
+                })
+        return records
+
+    def fetch_records(self) -> List[Dict[str, Any]]:
+        with self._flush_lock:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Write-behind flush before fetch failed, serving queued writes locally: {e}")
+            records = self.primary.fetch_records()
+            with self._condition:
+                records = self._overlay(records)
+                self._row_count = len(records)
+                # Callers take their row numbers from this fetch, so new writes match the sheet
+                if not self._queue:
+                    self._rows_stale = False
+        return records
+
+    def append_records(self, records: List[Dict[str, Any]]) -> int:
+        if self._row_count is None:
+            self.fetch_records()
+        with self._condition:
+            first_row = self._row_count + 2
+            self._enqueue(*(
+                {'op': 'append', 'row': first_row + offset, 'record': dict(record)}
+                for offset, record in enumerate(records)
+            ))
+            self._row_count += len(records)
+        return first_row
+
+    def update_fields(self, row_number: int, task_id: Optional[str], fields: Dict[str, Any]) -> None:
+        self._enqueue({'op': 'update', 'row': row_number, 'task_id': task_id, 'fields': dict(fields)})
+
+    def update_many(self, updates: List[Tuple[int, Optional[str], Dict[str, Any]]]) -> None:
+        self._enqueue(*(
+            {'op': 'update', 'row': row_number, 'task_id': task_id, 'fields': dict(fields)}
+            for row_number, task_id, fields in updates
+        ))
+
+    def delete_record(self, row_number: int, task_id: Optional[str]) -> None:
+        with self._condition:
+            self._enqueue({'op': 'delete', 'row': row_number, 'task_id': task_id})
+            if self._row_count is not None:
+                self._row_count -= 1
+
+    def add_rows_changed_listener(self, listener: Callable[[], None]) -> None:
+        self._rows_changed_listeners.append(listener)
+
+    def assign_task_ids(self, assignments: List[Tuple[int, str]]) -> None:
+        # Only happens right after a fetch, which has already flushed the queue
+        self.primary.assign_task_ids(assignments)
+
+    def close(self) -> None:
+        """Stop the flush thread and make a last attempt to flush; anything left stays journaled"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final write-behind flush failed, {self.pending()} writes kept in {self.journal_path}: {e}")
+        self._journal.close()
+        self.primary.close()